@@ -0,0 +1,163 @@
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SECRET_PATH = '/etc/secrets/twitter_account.json'
+
+# Seconds an account rests after x.com rejected its session
+AUTH_COOLDOWN = float(os.getenv('ACCOUNT_AUTH_COOLDOWN', 900))
+# Seconds an account rests after being rate limited
+RATE_LIMIT_COOLDOWN = float(os.getenv('ACCOUNT_RATE_LIMIT_COOLDOWN', 60))
+# How old a successful verification may get before the background check re-probes it
+RECHECK_INTERVAL = float(os.getenv('ACCOUNT_RECHECK_INTERVAL', 600))
+
+
+def secret_path():
+    return os.getenv('ACCOUNTS_SECRET_PATH', DEFAULT_SECRET_PATH)
+
+
+class AccountLoggedOut(Exception):
+    """x.com rejected the session of the account used for a request."""
+
+    def __init__(self, username, status_code):
+        super().__init__(f"Account {username} rejected with status {status_code}")
+        self.username = username
+        self.status_code = status_code
+
+
+class NoAccountAvailable(Exception):
+    """Every account in the pool is unhealthy or cooling down."""
+
+
+class AccountState:
+    __slots__ = ("account", "healthy", "last_verified", "last_used", "cooldown_until", "failures")
+
+    def __init__(self, account):
+        self.account = account
+        self.healthy = None  # None until the first request or probe tells us
+        self.last_verified = 0.0
+        self.last_used = 0.0
+        self.cooldown_until = 0.0
+        self.failures = 0
+
+
+class AccountPool:
+    """Long-lived pool of x.com sessions.
+
+    The secret file is parsed once and re-read only when its mtime changes.
+    Accounts are leased least-recently-used first, health is learned from the
+    status of real requests, and a background thread re-probes stale or
+    cooled-down accounts so that no probe sits on the scraping path.
+    """
+
+    def __init__(self, loader, verifier, path=secret_path):
+        self.loader = loader
+        self.verifier = verifier
+        self.path = path
+        self.states = {}
+        self.mtime = None
+        self.lock = threading.Lock()
+        self.checker = None
+
+    def _reload_if_changed(self):
+        path = self.path()
+        mtime = os.stat(path).st_mtime
+        if mtime == self.mtime:
+            return
+        accounts = self.loader()
+        states = {}
+        for account in accounts:
+            username = account['username']
+            state = self.states.get(username) or AccountState(account)
+            state.account = account
+            states[username] = state
+        self.states = states
+        self.mtime = mtime
+        logger.info(f"Loaded {len(states)} accounts from {path}")
+
+    def lease(self):
+        """Return the least recently used account that is usable right now."""
+        self.start()
+        with self.lock:
+            self._reload_if_changed()
+            now = time.time()
+            candidates = [
+                state for state in self.states.values()
+                if state.healthy is not False and state.cooldown_until <= now
+            ]
+            if not candidates:
+                raise NoAccountAvailable("No logged-in account available, all are cooling down")
+            state = min(candidates, key=lambda s: s.last_used)
+            state.last_used = now
+            return state.account
+
+    def report(self, username, status_code):
+        """Record the outcome of a request made with `username`."""
+        with self.lock:
+            state = self.states.get(username)
+            if state is None:
+                return
+            now = time.time()
+            if status_code == 200:
+                state.healthy = True
+                state.last_verified = now
+                state.failures = 0
+            elif status_code in (401, 403):
+                state.healthy = False
+                state.failures += 1
+                state.cooldown_until = now + AUTH_COOLDOWN * state.failures
+            elif status_code == 429:
+                state.cooldown_until = now + RATE_LIMIT_COOLDOWN
+
+    def _due_for_check(self, now):
+        with self.lock:
+            return [
+                state.account for state in self.states.values()
+                if state.cooldown_until <= now
+                and (state.healthy is False or now - state.last_verified >= RECHECK_INTERVAL)
+            ]
+
+    def check_all(self):
+        """Probe every account whose health is stale or whose cooldown has expired."""
+        for account in self._due_for_check(time.time()):
+            try:
+                status_code = self.verifier(account)
+            except Exception as e:
+                logger.warning(f"Account check for {account['username']} failed: {e}")
+                continue
+            self.report(account['username'], status_code)
+
+    def _run_checker(self):
+        while True:
+            try:
+                with self.lock:
+                    self._reload_if_changed()
+                self.check_all()
+            except Exception as e:
+                logger.warning(f"Account pool check failed: {e}")
+            time.sleep(min(RECHECK_INTERVAL, AUTH_COOLDOWN) / 2)
+
+    def start(self):
+        """Start the background checker once per process."""
+        if self.checker is not None:
+            return
+        with self.lock:
+            if self.checker is None:
+                self.checker = threading.Thread(target=self._run_checker, name="account-checker", daemon=True)
+                self.checker.start()
+
+    def stats(self):
+        now = time.time()
+        with self.lock:
+            return {
+                username: {
+                    "healthy": state.healthy,
+                    "last_verified": state.last_verified or None,
+                    "cooldown_seconds": max(0, round(state.cooldown_until - now)),
+                    "last_used": state.last_used or None,
+                }
+                for username, state in self.states.items()
+            }
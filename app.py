@@ -6,12 +6,23 @@ from utils import (
     process_retweeters,
     process_quotes,
     process_comments,
-    combine_all_data
+    combine_all_data,
+    ACCOUNT_POOL,
+    RESPONSE_CACHE,
+    PROFILES,
+    page_size_stats
 )
 import os
 import json
-import time
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import downloads
+import http_client
+import metrics
+from jobs import JobManager
+from profiles import RESULT_SORTS, MAX_RESULTS_PAGE
+from resilience import RetryBudget, breaker_stats
+from selection import Selection
 
 # Configure logging to print to the console
 logging.basicConfig(
@@ -32,13 +43,32 @@ HEADERS = {
     'x-rapidapi-host': "twitter241.p.rapidapi.com"
 }
 
+# Max number of (tweet, source) units fetched at the same time
+SCRAPE_CONCURRENCY = int(os.getenv('SCRAPE_CONCURRENCY', 6))
+
+SOURCES = {
+    "retweeters": lambda tweet_id, username, delta=False, selection=None, retries=None: process_retweeters(tweet_id, username, HEADERS, logger, delta=delta, selection=selection, retries=retries),
+    "commenters": lambda tweet_id, username, delta=False, selection=None, retries=None: process_comments(tweet_id, username, HEADERS, delta=delta, selection=selection, retries=retries),
+    "quoters": lambda tweet_id, username, delta=False, selection=None, retries=None: process_quotes(tweet_id, username, HEADERS, delta=delta, selection=selection, retries=retries),
+}
+
 
 @app.route('/')
 def index():
     return render_template('index.html')
 
-def generate_scraping_log(user_input):
-    """Generator to stream scraping progress to client."""
+def scrape_events(user_input, delta=False, min_followers=None, top_k=None, page_budget=None):
+    """Run a scrape, yielding progress events as dicts.
+
+    With `delta`, tweets scraped before are only paged until their known
+    engagers show up, and only the new ones are written. `min_followers`
+    sets who is written out, `top_k` keeps only the K biggest accounts in
+    memory (and lists them in the complete event) and `page_budget` caps
+    the pages fetched per tweet and source.
+    """
+    selection = Selection(min_followers, top_k, page_budget)
+    # Retries every request of this job draws from, so a failing upstream can't keep it busy
+    retries = RetryBudget()
     # Capture and stream progress
     log_entries = []
     
@@ -51,7 +81,7 @@ def generate_scraping_log(user_input):
         if result['type'] == 'invalid_url':
             log_entries.append({"status": "error", "message": "Invalid URL or username"})
             logger.info("Invalid URL or username")
-            yield f"data: {json.dumps({'status': 'error', 'message': 'Invalid URL or username'})}\n\n"
+            yield {'status': 'error', 'message': 'Invalid URL or username'}
             return
         
         # Determine username or tweet ID
@@ -60,17 +90,17 @@ def generate_scraping_log(user_input):
             log_entries.append({"status": "info", "message": f"Fetching data for username: {username}"})
             logger.info(f"Fetching data for username: {username}")
             # Get REST ID
-            rest_id = get_rest_id(username, HEADERS)
+            rest_id = get_rest_id(username, HEADERS, retries=retries)
             if not rest_id:
                 log_entries.append({"status": "error", "message": "Could not fetch user REST ID"})
                 logger.info("Could not fetch user REST ID")
-                yield f"data: {json.dumps({'status': 'error', 'message': 'Could not fetch user REST ID'})}\n\n"
+                yield {'status': 'error', 'message': 'Could not fetch user REST ID'}
                 return
             
             log_entries.append({"status": "info", "message": f"Retrieved REST ID: {rest_id}"})
             logger.info(f"Retrieved REST ID: {rest_id}")
             # Get tweets
-            tweets, tweet_ids = get_last_10_tweets(rest_id, HEADERS)
+            tweets, tweet_ids = get_last_10_tweets(rest_id, HEADERS, retries=retries)
             log_entries.append({"status": "info", "message": f"Found {len(tweets)} tweets"})
             logger.info(f"Found {len(tweets)} tweets")
         else:
@@ -81,62 +111,45 @@ def generate_scraping_log(user_input):
         # Ensure folder exists
         folder = username or tweet_ids[0]
         os.makedirs(folder, exist_ok=True)
+        # Users are read back page by page from the profile store through this handle
+        handle = username or tweet_ids[0]
+        PROFILES.save_results(handle, tweet_ids[:10])
         
-        # Process each tweet
-        all_retweeters = []
-        i=0
-        for tweet_id in tweet_ids:
-            if i >=10 :
-                break
-            log_entries.append({"status": "info", "message": f"Fetching retweeters for tweet: {tweet_id}"})
-            logger.info(f"Fetching retweeters for tweet: {tweet_id}")
-            # Process retweeters
-            try:
-                output_file, retweeters = process_retweeters(tweet_id, username, HEADERS,logger)
-                logger.info(f"Found {len(retweeters)} retweeters for tweet {tweet_id}")
+        # Process each tweet: every (tweet, source) pair is an independent unit
+        counts = {source: 0 for source in SOURCES}
+        top = selection.collector() if selection.top_k else None
+        with ThreadPoolExecutor(max_workers=SCRAPE_CONCURRENCY) as executor:
+            futures = {}
+            for tweet_id in tweet_ids[:10]:
+                log_entries.append({"status": "info", "message": f"Fetching retweeters, commenters and quoters for tweet: {tweet_id}"})
+                logger.info(f"Fetching retweeters, commenters and quoters for tweet: {tweet_id}")
+                yield log_entries[-1]
+                for source, process in SOURCES.items():
+                    futures[executor.submit(process, tweet_id, username, delta, selection, retries)] = (tweet_id, source)
+
+            for future in as_completed(futures):
+                tweet_id, source = futures[future]
+                try:
+                    output_file, users = future.result()
+                except Exception as e:
+                    logger.error(f"Failed to fetch {source} for tweet {tweet_id}: {e}")
+                    log_entries.append({"status": "error", "message": f"Failed to fetch {source} for tweet {tweet_id}: {e}"})
+                    yield log_entries[-1]
+                    continue
+
+                logger.info(f"Found {len(users)} {source} for tweet {tweet_id}")
                 log_entries.append({
-                    "status": "info", 
-                    "message": f"Found {len(retweeters)} retweeters for tweet {tweet_id}",
+                    "status": "info",
+                    "message": f"Found {len(users)} {source} for tweet {tweet_id}",
                     "output_file": output_file
                 })
-                
-                all_retweeters.extend(retweeters)
-                
-                # Stream progress
-                yield f"data: {json.dumps(log_entries[-1])}\n\n"
-                # Process retweeters
-                output_file_commenters, commenters = process_comments(tweet_id, username, HEADERS)
-                
-                log_entries.append({
-                    "status": "info", 
-                    "message": f"Found {len(commenters)} commeters for tweet {tweet_id}",
-                    "output_file": output_file_commenters
-                })
-                
-                all_retweeters.extend(commenters)
-                
+                counts[source] += len(users)
+                if top is not None:
+                    top.extend(users)
+
                 # Stream progress
-                yield f"data: {json.dumps(log_entries[-1])}\n\n"
-                log_entries.append({"status": "info", "message": f"Fetching quoters for tweet: {tweet_id}"})
-                
-                # Process retweeters
-                output_file_quoters, quoters = process_quotes(tweet_id, username, HEADERS)
-                
-                log_entries.append({
-                    "status": "info", 
-                    "message": f"Found {len(quoters)} quoters for tweet {tweet_id}",
-                    "output_file": output_file_quoters
-                })
-                
-                all_retweeters.extend(quoters)
-            
-                   # Stream progress
-                yield f"data: {json.dumps(log_entries[-1])}\n\n"
-        
-            except Exception as e:
-                print(e)
-            i+=1
-            time.sleep(5)
+                yield log_entries[-1]
+
          # Combine all data into a single file
         combined_file = combine_all_data(folder, username or tweet_ids[0])
         if combined_file:
@@ -144,23 +157,28 @@ def generate_scraping_log(user_input):
                 "status": "info",
                 "message": f"Combined all data into {combined_file}"
             })
-            yield f"data: {json.dumps(log_entries[-1])}\n\n"
-        # Find CSV files
+            yield log_entries[-1]
+        # Find CSV and Parquet files
         csv_files = [
             f for f in os.listdir(folder) 
-            if f.startswith(('tweet', 'combined')) and f.endswith('.csv')
+            if f.startswith(('tweet', 'combined')) and f.endswith(('.csv', '.parquet'))
         ]
         output_files = [os.path.join(folder, f) for f in csv_files]
         
         log_entries.append({
             "status": "complete", 
-            "message": f"Scraping complete. Generated {len(output_files)} CSV files",
+            "message": f"Scraping complete. Generated {len(output_files)} output files",
             "output_files": output_files,
-            "total_retweeters": len(all_retweeters),
-            "retwitters":all_retweeters
+            "total_retweeters": sum(counts.values()),
+            "counts": counts,
+            "retries_used": retries.used,
+            "results_handle": handle,
+            "results_url": f"/results/{handle}"
         })
+        if top is not None:
+            log_entries[-1]["top"] = [dict(user.as_row(), id=str(user.id)) for user in top]
         
-        yield f"data: {json.dumps(log_entries[-1])}\n\n"
+        yield log_entries[-1]
 
         
         
@@ -168,21 +186,162 @@ def generate_scraping_log(user_input):
     except Exception as e:
         error_entry = {"status": "error", "message": str(e)}
         log_entries.append(error_entry)
-        yield f"data: {json.dumps(error_entry)}\n\n"
+        yield error_entry
+
+def generate_scraping_log(user_input):
+    """Generator to stream scraping progress to client."""
+    for event in scrape_events(user_input):
+        yield f"data: {json.dumps(event)}\n\n"
+
+def job_key(user_input, options):
+    """Inputs that scrape the same thing the same way share a key, so their jobs are coalesced."""
+    result = get_user_or_tweet_data((user_input or "").strip())
+    data = result['data'].lower() if result['type'] == 'username' else result['data']
+    # Only unset options are left out: min_followers=0 is a different job from the default threshold
+    return f"{result['type']}:{data}" + "".join(
+        f":{name}={value}" for name, value in sorted(options.items()) if value is not None and value is not False)
+
+def json_body():
+    """The request's JSON object, {} if it has no JSON body, None if the JSON isn't an object."""
+    body = request.get_json(silent=True)
+    if body is None:
+        return {}
+    return body if isinstance(body, dict) else None
+
+def scrape_options():
+    """Job options from the request: mode=delta re-scrapes only new engagers,
+    min_followers, top_k and page_budget select who is kept and how far to page."""
+    values = dict(json_body() or {}, **request.values.to_dict())
+    options = {"delta": values.get('mode') == "delta"}
+    for name in ("min_followers", "top_k", "page_budget"):
+        value = values.get(name)
+        value = "" if value is None else str(value).strip()
+        options[name] = int(value) if value.isdigit() else None
+    # top_k and page_budget of 0 mean no limit, same as leaving them out
+    for name in ("top_k", "page_budget"):
+        options[name] = options[name] or None
+    return options
+
+def submit_job(user_input):
+    options = scrape_options()
+    return JOBS.submit(job_key(user_input, options), client_id(), user_input, options)
+
+def client_id():
+    forwarded = request.headers.get('X-Forwarded-For', '')
+    return forwarded.split(',')[0].strip() or request.remote_addr
+
+def stream_job(job, start=0):
+    """SSE view of a job's events. The `id:` lets EventSource resume after a reconnect."""
+    for index, event in job.subscribe(start):
+        if event is None:
+            yield ": keep-alive\n\n"
+        else:
+            yield f"id: {index}\ndata: {json.dumps(event)}\n\n"
+
+JOBS = JobManager(scrape_events)
 
 @app.route('/scrape', methods=['POST'])
 def scrape():
     user_input = request.form['input']
-    return render_template('results.html', stream_url=f'/stream_scrape?input={user_input}')
+    job = submit_job(user_input)
+    return render_template('results.html', stream_url=f'/jobs/{job.id}/events')
 
 @app.route('/stream_scrape')
 def stream_scrape():
     user_input = request.args.get('input')
-    return Response(generate_scraping_log(user_input), mimetype='text/event-stream')
+    job = submit_job(user_input)
+    return Response(stream_job(job), mimetype='text/event-stream')
+
+@app.route('/jobs', methods=['POST'])
+def create_job():
+    body = json_body()
+    if body is None:
+        return {"error": "JSON body must be an object"}, 400
+    user_input = request.form.get('input') or body.get('input')
+    if not user_input:
+        return {"error": "Missing input"}, 400
+    job = submit_job(user_input)
+    return job.summary(), 202
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    job = JOBS.get(job_id)
+    if job is None:
+        return {"error": "Unknown job"}, 404
+    return job.summary()
+
+@app.route('/jobs/<job_id>/events')
+def job_events(job_id):
+    job = JOBS.get(job_id)
+    if job is None:
+        return {"error": "Unknown job"}, 404
+    last_event_id = request.headers.get('Last-Event-ID')
+    start = int(last_event_id) + 1 if last_event_id and last_event_id.isdigit() else 0
+    return Response(stream_job(job, start), mimetype='text/event-stream')
+
+@app.route('/results/<handle>')
+def results(handle):
+    """Page through the users of a scrape: ?source=&min_followers=&sort=&order=&offset=&limit="""
+    sort = request.args.get('sort', 'followers_count')
+    source = request.args.get('source')
+    if sort not in RESULT_SORTS:
+        return {"error": f"sort must be one of {', '.join(RESULT_SORTS)}"}, 400
+    if source and source not in SOURCES:
+        return {"error": f"source must be one of {', '.join(SOURCES)}"}, 400
+    try:
+        min_followers = int(request.args.get('min_followers', 0))
+        offset = max(int(request.args.get('offset', 0)), 0)
+        limit = max(min(int(request.args.get('limit', 100)), MAX_RESULTS_PAGE), 1)
+    except ValueError:
+        return {"error": "min_followers, offset and limit must be integers"}, 400
+    page = PROFILES.results(
+        handle, source=source, min_followers=min_followers, sort=sort,
+        descending=request.args.get('order', 'desc') != 'asc', offset=offset, limit=limit,
+    )
+    if page is None:
+        return {"error": "Unknown results handle"}, 404
+    total, users = page
+    next_offset = offset + len(users)
+    return {
+        "handle": handle,
+        "total": total,
+        "offset": offset,
+        "next_offset": next_offset if next_offset < total else None,
+        "users": users,
+    }
+
+@app.route('/metrics')
+def metrics_endpoint():
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/stats')
+def stats():
+    return {
+        "http_pools": http_client.pool_stats(),
+        "rate_limits": http_client.limiter.stats(),
+        "accounts": ACCOUNT_POOL.stats(),
+        "response_cache": RESPONSE_CACHE.stats(),
+        "profiles": PROFILES.stats(),
+        "page_sizes": page_size_stats(),
+        "circuit_breakers": breaker_stats(),
+        "jobs": JOBS.stats(),
+    }
 
 @app.route('/download/<path:filename>')
 def download_file(filename):
-    return send_file(filename, as_attachment=True)
+    """Output file download: zstd/gzip when the client accepts it, ETag validation and Range requests."""
+    path = downloads.resolve(filename)
+    if path is None:
+        return {"error": "File not found"}, 404
+    encoding = request.accept_encodings.best_match(downloads.encodings_for(path))
+    served = downloads.encoded(path, encoding) if encoding else path
+    response = send_file(served, as_attachment=True, download_name=os.path.basename(path), conditional=True, etag=True)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Vary'] = 'Accept-Encoding'
+    # Combined files grow while scrapes run, so clients revalidate with the ETag every time
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,148 @@
+"""Scrape many usernames and tweet URLs in one run, without going through the web app.
+
+    python batch.py targets.txt [--out DIR] [--concurrency N] [--min-followers N] [--page-budget N] [--delta]
+
+targets.txt has one username or tweet URL per line; blank lines and lines
+starting with # are ignored. Every tweet is scraped once per source even if
+several targets share it, each username is looked up once, and the whole
+batch shares one set of HTTP connections and logged-in accounts. Writes
+<label>.csv per target, combined_batch.csv across all of them and
+summary.json into the output folder.
+"""
+import argparse
+import json
+import logging
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from app import HEADERS, SOURCES, SCRAPE_CONCURRENCY
+from resilience import JOB_RETRY_BUDGET, RetryBudget
+from selection import MIN_FOLLOWERS, Selection
+from sinks import CsvSink
+from utils import get_user_or_tweet_data, get_rest_id, get_last_10_tweets, PROFILES
+
+logger = logging.getLogger(__name__)
+
+# Labels name output files, so usernames must look like real handles
+USERNAME_PATTERN = re.compile(r"^[A-Za-z0-9_]{1,15}$")
+
+
+def read_targets(path):
+    """Inputs of the batch file, in order, without repeats (usernames compared case-insensitively)."""
+    targets, seen = [], set()
+    with open(path, 'r', encoding='utf-8') as file:
+        for line in file:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            result = get_user_or_tweet_data(line)
+            key = (result['type'], (result['data'] or line).lower())
+            if key not in seen:
+                seen.add(key)
+                targets.append((line, result))
+    return targets
+
+
+def resolve(targets, retries=None):
+    """Map every target label to its tweet ids; each username costs one lookup."""
+    resolved, failed = {}, {}
+    for line, result in targets:
+        if result['type'] == 'invalid_url' or (result['type'] == 'username' and not USERNAME_PATTERN.match(result['data'])):
+            failed[line] = "Invalid URL or username"
+            continue
+        if result['type'] == 'tweet':
+            resolved[result['data']] = (None, [result['data']])
+            continue
+        username = result['data']
+        rest_id = get_rest_id(username, HEADERS, retries=retries)
+        if not rest_id:
+            failed[line] = "Could not fetch user REST ID"
+            continue
+        _, tweet_ids = get_last_10_tweets(rest_id, HEADERS, retries=retries)
+        resolved[username] = (username, tweet_ids[:10])
+        logger.info(f"{username}: {len(tweet_ids[:10])} tweets")
+    return resolved, failed
+
+
+def scrape(resolved, concurrency, delta=False, selection=None, retries=None):
+    """Fetch every (tweet, source) of the batch once. Returns {(tweet_id, source): error} for failures."""
+    owners = {}
+    for username, tweet_ids in resolved.values():
+        for tweet_id in tweet_ids:
+            # A tweet shared by several targets is fetched into the folder of the first one
+            owners.setdefault(tweet_id, username)
+    logger.info(f"Scraping {len(owners)} unique tweets for {len(resolved)} targets")
+
+    errors = {}
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = {
+            executor.submit(process, tweet_id, username, delta, selection, retries): (tweet_id, source)
+            for tweet_id, username in owners.items()
+            for source, process in SOURCES.items()
+        }
+        for future in as_completed(futures):
+            tweet_id, source = futures[future]
+            try:
+                _, users = future.result()
+                logger.info(f"Found {len(users)} {source} for tweet {tweet_id}")
+            except Exception as e:
+                logger.error(f"Failed to fetch {source} for tweet {tweet_id}: {e}")
+                errors[(tweet_id, source)] = str(e)
+    return errors
+
+
+def write_outputs(out, resolved, min_followers):
+    """One CSV per target and one across the batch, read from the profile store."""
+    counts = {}
+    with CsvSink() as sink:
+        for label, (_, tweet_ids) in resolved.items():
+            PROFILES.save_results(label, tweet_ids)
+            path = os.path.join(out, f"{label}.csv")
+            counts[label] = 0
+            for user in PROFILES.engaged_users(tweet_ids, min_followers):
+                sink.write(path, user)
+                counts[label] += 1
+        all_tweet_ids = sorted({tweet_id for _, tweet_ids in resolved.values() for tweet_id in tweet_ids})
+        counts["combined_batch"] = 0
+        for user in PROFILES.engaged_users(all_tweet_ids, min_followers):
+            sink.write(os.path.join(out, "combined_batch.csv"), user)
+            counts["combined_batch"] += 1
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("targets", help="file with one username or tweet URL per line")
+    parser.add_argument("--out", default=time.strftime("batch_%Y%m%d-%H%M%S"), help="output folder")
+    parser.add_argument("--concurrency", type=int, default=SCRAPE_CONCURRENCY, help="(tweet, source) units in flight")
+    parser.add_argument("--min-followers", type=int, default=MIN_FOLLOWERS)
+    parser.add_argument("--page-budget", type=int, help="pages fetched per tweet and source at most")
+    parser.add_argument("--delta", action="store_true", help="only page tweets until their known engagers show up")
+    args = parser.parse_args()
+
+    start = time.time()
+    os.makedirs(args.out, exist_ok=True)
+    targets = read_targets(args.targets)
+    # The whole batch shares one retry budget, sized like a job's for every target, lookups included
+    retries = RetryBudget(JOB_RETRY_BUDGET * max(len(targets), 1))
+    resolved, failed = resolve(targets, retries)
+    errors = scrape(resolved, args.concurrency, args.delta, Selection(args.min_followers, page_budget=args.page_budget), retries)
+    counts = write_outputs(args.out, resolved, args.min_followers)
+
+    summary = {
+        "targets": {label: {"tweet_ids": tweet_ids, "users": counts[label]} for label, (_, tweet_ids) in resolved.items()},
+        "combined_users": counts["combined_batch"],
+        "failed_targets": failed,
+        "retries_used": retries.used,
+        "failed_units": [{"tweet_id": tweet_id, "source": source, "error": error} for (tweet_id, source), error in errors.items()],
+        "seconds": round(time.time() - start, 1),
+    }
+    with open(os.path.join(args.out, "summary.json"), 'w', encoding='utf-8') as file:
+        json.dump(summary, file, indent=2)
+    logger.info(f"Batch of {len(targets)} targets done in {summary['seconds']}s, {counts['combined_batch']} users -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
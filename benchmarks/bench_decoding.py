@@ -0,0 +1,68 @@
+"""Decode + parse cost per page: the old try-each-codec decoder vs. decoding.decode_body.
+
+    python -m benchmarks.bench_decoding [--users N] [--repeat N]
+"""
+import argparse
+import gzip
+import json
+import time
+
+import zstandard as zstd
+
+import decoding
+from benchmarks import fixtures
+
+
+def legacy_decode(content):
+    """What handle_compressed_response did: full UTF-8 decode + json.loads first, then zstd, then gzip."""
+    try:
+        return json.loads(content.decode('utf-8'))
+    except UnicodeDecodeError:
+        pass
+    if content.startswith(decoding.ZSTD_MAGIC):
+        return json.loads(zstd.ZstdDecompressor().decompress(content))
+    if content[:2] == decoding.GZIP_MAGIC:
+        return json.loads(gzip.decompress(content))
+    return json.loads(content.decode('utf-8', errors='replace'))
+
+
+def ms_per_page(decode, bodies, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for body in bodies:
+            decode(body)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000 / len(bodies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=500, help="users per synthesised page")
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    pages = fixtures.recorded("retweeters") or [
+        fixtures.retweeters_page(n, per_page=args.users, pages=args.pages) for n in range(args.pages)
+    ]
+    plain = [json.dumps(page).encode() for page in pages]
+    encodings = {
+        "identity": plain,
+        "gzip": [gzip.compress(body) for body in plain],
+        "zstd": [zstd.ZstdCompressor().compress(body) for body in plain],
+    }
+    backends = ["json", "orjson"] if decoding.orjson else ["json"]
+
+    print(f"{sum(map(len, plain)) / len(plain) / 1024:.0f} KiB/page uncompressed")
+    print(f"{'encoding':<10}{'legacy':>14}" + "".join(f"{f'decode_body/{b}':>22}" for b in backends))
+    for encoding, bodies in encodings.items():
+        row = [ms_per_page(legacy_decode, bodies, args.repeat)]
+        for backend in backends:
+            decoding.set_backend(backend)
+            row.append(ms_per_page(decoding.decode_body, bodies, args.repeat))
+        print(f"{encoding:<10}{row[0]:>11.3f} ms" + "".join(f"{value:>19.3f} ms" for value in row[1:]))
+    decoding.set_backend(decoding.JSON_BACKEND)
+
+if __name__ == "__main__":
+    main()
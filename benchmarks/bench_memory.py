@@ -0,0 +1,60 @@
+"""Memory retained per engaged user: dicts with string ids vs. EngagedUser with int ids.
+
+    python -m benchmarks.bench_memory [--pages N]
+"""
+import argparse
+import gc
+import tracemalloc
+
+from benchmarks import fixtures
+from records import EngagedUser
+from timeline import extract_timeline, USER_FIELDS
+
+
+def as_dicts(users, seen, page):
+    for screen_name, name, user_id, followers_count in page.users:
+        if user_id in seen:
+            continue
+        seen.add(user_id)
+        users.append({"username": screen_name, "name": name, "id": user_id, "followers_count": followers_count})
+
+
+def as_records(users, seen, page):
+    for screen_name, name, user_id, followers_count in page.users:
+        user_id = int(user_id)
+        if user_id in seen:
+            continue
+        seen.add(user_id)
+        users.append(EngagedUser(screen_name, name, user_id, followers_count))
+
+
+def retained(collect, pages):
+    """Bytes still allocated after scraping `pages` pages with `collect`; pages are dropped as in a real scrape."""
+    gc.collect()
+    tracemalloc.start()
+    users, seen = [], set()
+    for n in range(pages):
+        response = fixtures.retweeters_page(n, pages=pages)
+        collect(users, seen, extract_timeline(response["data"]["retweeters_timeline"]["timeline"]["instructions"], users=USER_FIELDS, top_level_only=True))
+        del response
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, len(users)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=200)
+    args = parser.parse_args()
+
+    before, count = retained(as_dicts, args.pages)
+    after, _ = retained(as_records, args.pages)
+    print(f"{count} users")
+    print(f"{'dict + str ids':<24}{before / count:>10.1f} bytes/user")
+    print(f"{'EngagedUser + int ids':<24}{after / count:>10.1f} bytes/user")
+    print(f"{'saved':<24}{1 - after / before:>10.1%}")
+
+
+if __name__ == "__main__":
+    main()
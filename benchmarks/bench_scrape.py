@@ -0,0 +1,115 @@
+"""End-to-end scrape throughput against the local mock API (no network needed).
+
+    python -m benchmarks.bench_scrape [--pages N] [--latency S] [--every-429 N] [--jobs N]
+
+Reports fetcher pages/sec, parse ms/page, bytes allocated during a job and
+the wall time of generate_scraping_log for a username (10 tweets x 3 sources).
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.mock_server import MockConfig, MockServer
+
+
+def _prepare_environment(workdir, base_url):
+    """Point the app at the mock server and keep its state out of the repo; must run before importing it."""
+    secret = os.path.join(workdir, "accounts.json")
+    with open(secret, "w", encoding="utf-8") as file:
+        json.dump({"accounts": [{
+            "username": "bench",
+            "cookies": [{"domain": ".x.com", "name": "auth_token", "value": "bench"}],
+            "headers": {"x-csrf-token": "bench", "x-client-uuid": "bench", "x-client-transaction-id": "bench"},
+        }]}, file)
+    os.environ.update({
+        "HTTP_BASE_URL": base_url,
+        "ACCOUNTS_SECRET_PATH": secret,
+        "RAPIDAPI_RATE": os.getenv("RAPIDAPI_RATE", "10000"),
+        "X_RATE": os.getenv("X_RATE", "10000"),
+        "CHECKPOINT_DB": os.path.join(workdir, "checkpoints.db"),
+        "PROFILE_DB": os.path.join(workdir, "profiles.db"),
+        "RESPONSE_CACHE_DB": os.path.join(workdir, "response_cache.db"),
+    })
+    os.chdir(workdir)
+
+
+def bench_fetchers(server, utils, tweet_id):
+    logger = logging.getLogger("bench")
+    account = utils.ACCOUNT_POOL.lease()
+    headers = account["headers"]
+    runs = {
+        "retweeters": lambda: utils.fetch_all_retweeters(
+            tweet_id, "fetchers", logger, account["formatted_cookies"], headers["x-csrf-token"],
+            headers["x-client-uuid"], headers["x-client-transaction-id"], account=account["username"]),
+        "comments": lambda: utils.get_posts_commenters(tweet_id, {}, "fetchers"),
+        "quotes": lambda: utils.get_posts_quotes(tweet_id, {}, "fetchers"),
+    }
+    os.makedirs("fetchers", exist_ok=True)
+    results = {}
+    for kind, run in runs.items():
+        before = server.requests
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        results[kind] = (server.requests - before, elapsed)
+    return results
+
+
+def bench_job(app, username, trace=False):
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    events = 0
+    for _ in app.generate_scraping_log(username):
+        events += 1
+    elapsed = time.perf_counter() - start
+    peak = None
+    if trace:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return elapsed, events, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=10, help="pages per timeline")
+    parser.add_argument("--latency", type=float, default=0.02, help="mock response latency in seconds")
+    parser.add_argument("--every-429", type=int, default=0, help="rate-limit every Nth request")
+    parser.add_argument("--jobs", type=int, default=3, help="end-to-end jobs to time")
+    args = parser.parse_args()
+
+    config = MockConfig(latency=args.latency, pages=args.pages, every_429=args.every_429)
+    with MockServer(config) as server, tempfile.TemporaryDirectory() as workdir:
+        _prepare_environment(workdir, server.url)
+        sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        import app
+        import utils
+        from benchmarks import bench_timeline, fixtures
+        logging.getLogger().setLevel(logging.ERROR)
+
+        print(f"mock: {server.url}, {args.pages} pages/timeline, {args.latency * 1000:.0f} ms latency, "
+              f"429 every {args.every_429 or '-'} requests")
+        print(f"\n{'fetcher':<12}{'pages':>8}{'seconds':>10}{'pages/sec':>12}{'parse ms/page':>16}")
+        for kind, (pages, elapsed) in bench_fetchers(server, utils, "1900000000000000001").items():
+            parse = bench_timeline.ms_per_page(bench_timeline.CASES[kind][1], fixtures.pages(kind, count=args.pages), 5)
+            print(f"{kind:<12}{pages:>8}{elapsed:>10.2f}{pages / elapsed:>12.1f}{parse:>16.3f}")
+
+        print(f"\n{'job':<12}{'requests':>10}{'events':>8}{'seconds':>10}")
+        times = []
+        for n in range(args.jobs):
+            before = server.requests
+            elapsed, events, _ = bench_job(app, f"bench_user_{n}")
+            times.append(elapsed)
+            print(f"{f'#{n}':<12}{server.requests - before:>10}{events:>8}{elapsed:>10.2f}")
+        _, _, peak = bench_job(app, "bench_user_traced", trace=True)
+        print(f"\nmedian job: {sorted(times)[len(times) // 2]:.2f}s, peak traced allocation: {peak / 1e6:.1f} MB, "
+              f"429s injected: {server.rate_limited}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Cold start of a web worker: time to import app.py and the memory it holds afterwards.
+
+    python -m benchmarks.bench_startup [--runs N] [--workers N] [--compare MODULE ...]
+
+Every run is a fresh interpreter in an empty folder, like a gunicorn worker
+booting, so nothing is cached in-process. --compare times other imports the
+same way (e.g. pandas, to see what keeping it off the import path saves).
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Imports that should only happen when a feature needs them, never at worker boot
+HEAVY_MODULES = ("pandas", "numpy", "pyarrow")
+
+_PROBE = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+rss = 0
+with open("/proc/self/status") as status:
+    for line in status:
+        if line.startswith("VmRSS:"):
+            rss = int(line.split()[1]) * 1024
+print(json.dumps({{"seconds": seconds, "rss": rss, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def probe(module, runs):
+    """Import `module` in `runs` fresh interpreters; returns their measurements, or None if it isn't installed."""
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for _ in range(runs):
+            code = _PROBE.format(root=ROOT, module=module, heavy=HEAVY_MODULES)
+            done = subprocess.run([sys.executable, "-c", code], cwd=workdir, capture_output=True, text=True)
+            if done.returncode != 0:
+                if "ModuleNotFoundError" in done.stderr:
+                    return None
+                raise RuntimeError(f"importing {module} failed:\n{done.stderr}")
+            results.append(json.loads(done.stdout.strip().splitlines()[-1]))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=int(os.getenv('WEB_CONCURRENCY', 4)),
+                        help="gunicorn workers, to total the memory across them")
+    parser.add_argument("--compare", nargs="*", default=[], help="other modules to import the same way")
+    args = parser.parse_args()
+
+    baseline = probe("sys", args.runs)
+    base_rss = statistics.median(run["rss"] for run in baseline)
+    print(f"{'import':<12}{'median ms':>10}{'RSS MB':>9}{'+ over python':>15}{'x workers':>11}  heavy modules loaded")
+    for module in ["app", *args.compare]:
+        runs = probe(module, args.runs)
+        if runs is None:
+            print(f"{module:<12}  not installed")
+            continue
+        seconds = statistics.median(run["seconds"] for run in runs)
+        rss = statistics.median(run["rss"] for run in runs)
+        loaded = sorted({name for run in runs for name in run["loaded"]})
+        print(f"{module:<12}{seconds * 1000:>10.0f}{rss / 2**20:>9.1f}{(rss - base_rss) / 2**20:>15.1f}"
+              f"{args.workers * (rss - base_rss) / 2**20:>11.1f}  {', '.join(loaded) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Parse cost per page: nested per-fetcher loops vs. timeline.extract_timeline.
+
+    python -m benchmarks.bench_timeline [--pages N] [--repeat N]
+"""
+import argparse
+import time
+
+from benchmarks import fixtures
+from timeline import extract_timeline, USER_FIELDS, ENGAGEMENT_FIELDS, QUOTE_FIELDS
+
+
+def legacy_retweeters(response):
+    """The loops fetch_all_retweeters used before the extractor: users, then a second pass for the cursor."""
+    users = []
+    instructions = response["data"]["retweeters_timeline"]["timeline"]["instructions"]
+    for instruction in instructions:
+        if instruction["type"] == "TimelineAddEntries":
+            for entry in instruction["entries"]:
+                if "itemContent" in entry["content"] and "user_results" in entry["content"]["itemContent"]:
+                    user_data = entry["content"]["itemContent"]["user_results"]["result"]
+                    legacy_data = user_data["legacy"]
+                    users.append({
+                        "username": legacy_data["screen_name"],
+                        "name": legacy_data["name"],
+                        "id": user_data["rest_id"],
+                        "followers_count": legacy_data["followers_count"]
+                    })
+    cursor = None
+    for instruction in instructions:
+        if instruction["type"] == "TimelineAddEntries":
+            for entry in instruction["entries"]:
+                if entry["content"]["entryType"] == "TimelineTimelineCursor" and entry["content"].get("cursorType") == "Bottom":
+                    cursor = entry["content"]["value"]
+    return users, cursor
+
+
+def legacy_comments(response):
+    users = []
+    for instruction in response["result"]["instructions"]:
+        if instruction and "entries" in instruction:
+            for entry in instruction["entries"]:
+                if "content" in entry and "items" in entry["content"]:
+                    for item in entry["content"]["items"]:
+                        item_content = item["item"]["itemContent"]
+                        if "tweet_results" in item_content:
+                            tweet_data = item_content["tweet_results"]["result"]
+                            core_data = tweet_data["core"]["user_results"]['result']
+                            users.append((tweet_data["legacy"]["id_str"], {
+                                "username": core_data['legacy']["screen_name"],
+                                "name": core_data['legacy']["name"],
+                                "id": core_data["rest_id"],
+                                "followers_count": core_data['legacy']["followers_count"]
+                            }))
+    return users, response["cursor"].get("bottom")
+
+
+def legacy_quotes(response):
+    users = []
+    for instruction in response["result"]["timeline"]["instructions"]:
+        if instruction["type"] == "TimelineAddEntries":
+            for entry in instruction["entries"]:
+                if "content" in entry and "itemContent" in entry["content"]:
+                    item_content = entry["content"]["itemContent"]
+                    if "tweet_results" in item_content:
+                        tweet_data = item_content["tweet_results"]["result"]
+                        legacy_data = tweet_data["legacy"]
+                        core_data = tweet_data["core"]["user_results"]['result']
+                        users.append(({
+                            "tweet_id": legacy_data["id_str"],
+                            "text": legacy_data["full_text"],
+                            "retweet_count": legacy_data["retweet_count"],
+                            "favorite_count": legacy_data["favorite_count"],
+                            "language": legacy_data["lang"],
+                            "is_retweet": "retweeted_status_result" in tweet_data,
+                            "is_quote": legacy_data.get("is_quote_status", False)
+                        }, {
+                            "username": core_data['legacy']["screen_name"],
+                            "name": core_data['legacy']["name"],
+                            "id": core_data["rest_id"],
+                            "followers_count": core_data['legacy']["followers_count"]
+                        }))
+    return users, response["cursor"].get("bottom")
+
+
+CASES = {
+    "retweeters": (
+        legacy_retweeters,
+        lambda r: extract_timeline(r["data"]["retweeters_timeline"]["timeline"]["instructions"], users=USER_FIELDS, top_level_only=True),
+    ),
+    "comments": (
+        legacy_comments,
+        lambda r: extract_timeline(r["result"]["instructions"], tweets=ENGAGEMENT_FIELDS, modules_only=True),
+    ),
+    "quotes": (
+        legacy_quotes,
+        lambda r: extract_timeline(r["result"]["timeline"]["instructions"], tweets=QUOTE_FIELDS, top_level_only=True),
+    ),
+}
+
+
+def ms_per_page(parse, pages, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for page in pages:
+            parse(page)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000 / len(pages)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'source':<12}{'legacy ms/page':>16}{'extractor ms/page':>20}{'speedup':>10}")
+    for kind, (legacy, extractor) in CASES.items():
+        pages = fixtures.pages(kind, count=args.pages)
+        before = ms_per_page(legacy, pages, args.repeat)
+        after = ms_per_page(extractor, pages, args.repeat)
+        print(f"{kind:<12}{before:>16.4f}{after:>20.4f}{before / after:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+import glob
+import json
+import os
+import random
+import zlib
+
+# Recorded responses live in BENCH_FIXTURES_DIR as <kind>_<n>.json
+# (kind = retweeters, comments, quotes, user_tweets). When there are none,
+# pages with the same shape are synthesised so benchmarks still run offline.
+FIXTURES_DIR = os.getenv('BENCH_FIXTURES_DIR', os.path.join(os.path.dirname(__file__), 'recorded'))
+
+# Entry numbers reserved per page, so pages of any size (up to this) never repeat an id
+ID_STRIDE = 1000
+
+_LOREM = ("gm wagmi solana validators shipping faster blocks cheaper fees "
+          "community builders airdrop season thread below").split()
+
+
+def _user(rng, n):
+    followers = int(rng.paretovariate(1.2) * 40)
+    return {
+        "__typename": "User",
+        "id": f"VXNlcjo{n}",
+        "rest_id": str(1_000_000_000_000 + n),
+        "is_blue_verified": rng.random() < 0.2,
+        "legacy": {
+            "created_at": "Wed Jan 05 10:00:00 +0000 2022",
+            "description": " ".join(rng.choices(_LOREM, k=12)),
+            "favourites_count": rng.randint(0, 50_000),
+            "followers_count": followers,
+            "friends_count": rng.randint(0, 5_000),
+            "listed_count": rng.randint(0, 100),
+            "location": "Earth",
+            "media_count": rng.randint(0, 500),
+            "name": f"User {n}",
+            "profile_image_url_https": f"https://pbs.twimg.com/profile_images/{n}/a_normal.jpg",
+            "screen_name": f"user_{n}",
+            "statuses_count": rng.randint(0, 90_000),
+            "verified": False,
+        },
+    }
+
+
+def _tweet(rng, n, author):
+    return {
+        "__typename": "Tweet",
+        "rest_id": str(1_800_000_000_000_000_000 + n),
+        "core": {"user_results": {"result": author}},
+        "views": {"count": str(rng.randint(0, 10**6)), "state": "EnabledWithCount"},
+        "legacy": {
+            "bookmark_count": rng.randint(0, 100),
+            "conversation_id_str": "1800000000000000000",
+            "created_at": "Thu Jan 23 18:00:00 +0000 2025",
+            "entities": {"hashtags": [], "symbols": [], "urls": [], "user_mentions": []},
+            "favorite_count": rng.randint(0, 10_000),
+            "full_text": " ".join(rng.choices(_LOREM, k=25)),
+            "id_str": str(1_800_000_000_000_000_000 + n),
+            "is_quote_status": True,
+            "lang": "en",
+            "quote_count": rng.randint(0, 100),
+            "reply_count": rng.randint(0, 100),
+            "retweet_count": rng.randint(0, 1_000),
+            "user_id_str": author["rest_id"],
+        },
+    }
+
+
+def _cursor(kind, value):
+    return {
+        "entryId": f"cursor-{kind.lower()}-{value}",
+        "sortIndex": "0",
+        "content": {"entryType": "TimelineTimelineCursor", "__typename": "TimelineTimelineCursor",
+                    "value": value, "cursorType": kind},
+    }
+
+
+def retweeters_page(page, per_page=64, pages=10, seed=0):
+    rng = random.Random(seed * 100_003 + page)
+    entries = [
+        {
+            "entryId": f"user-{page * ID_STRIDE + i}",
+            "sortIndex": str(page * ID_STRIDE + i),
+            "content": {
+                "entryType": "TimelineTimelineItem",
+                "itemContent": {"itemType": "TimelineUser", "user_results": {"result": _user(rng, page * ID_STRIDE + i)}},
+            },
+        }
+        for i in range(per_page)
+    ]
+    entries.append(_cursor("Top", f"top-{page}"))
+    if page + 1 < pages:
+        entries.append(_cursor("Bottom", f"page-{page + 1}"))
+    return {"data": {"retweeters_timeline": {"timeline": {"instructions": [
+        {"type": "TimelineClearCache"},
+        {"type": "TimelineAddEntries", "entries": entries},
+    ]}}}}
+
+
+def comments_page(page, per_page=20, pages=10, seed=0):
+    rng = random.Random(seed * 100_019 + page)
+    entries = []
+    for i in range(per_page):
+        n = page * ID_STRIDE + i
+        entries.append({
+            "entryId": f"conversationthread-{n}",
+            "content": {
+                "entryType": "TimelineTimelineModule",
+                "items": [{"entryId": f"tweet-{n}", "item": {"itemContent": {
+                    "itemType": "TimelineTweet", "tweet_results": {"result": _tweet(rng, n, _user(rng, n))},
+                }}}],
+            },
+        })
+    response = {"result": {"instructions": [{"type": "TimelineAddEntries", "entries": entries}]}, "cursor": {"top": f"top-{page}"}}
+    if page + 1 < pages:
+        response["cursor"]["bottom"] = f"page-{page + 1}"
+    return response
+
+
+def _tweet_timeline(rng, page, per_page, pages):
+    entries = [
+        {
+            "entryId": f"tweet-{page * ID_STRIDE + i}",
+            "content": {"entryType": "TimelineTimelineItem", "itemContent": {
+                "itemType": "TimelineTweet",
+                "tweet_results": {"result": _tweet(rng, page * ID_STRIDE + i, _user(rng, page * ID_STRIDE + i))},
+            }},
+        }
+        for i in range(per_page)
+    ]
+    if page + 1 < pages:
+        entries.append(_cursor("Bottom", f"page-{page + 1}"))
+    return {"timeline": {"instructions": [{"type": "TimelineAddEntries", "entries": entries}]}}
+
+
+def quotes_page(page, per_page=20, pages=10, seed=0):
+    rng = random.Random(seed * 100_043 + page)
+    response = {"result": _tweet_timeline(rng, page, per_page, pages), "cursor": {"top": f"top-{page}"}}
+    if page + 1 < pages:
+        response["cursor"]["bottom"] = f"page-{page + 1}"
+    return response
+
+
+def user_tweets_page(count=10, seed=0):
+    rng = random.Random(seed)
+    return {"result": _tweet_timeline(rng, 0, count, 1)}
+
+
+def user_lookup(username, seed=0):
+    return {"result": {"data": {"user": {"result": {"rest_id": str(zlib.crc32(f"{username}:{seed}".encode()) + 10**11)}}}}}
+
+
+GENERATORS = {
+    "retweeters": retweeters_page,
+    "comments": comments_page,
+    "quotes": quotes_page,
+}
+
+
+def recorded(kind, directory=FIXTURES_DIR):
+    """Recorded pages of `kind`, in file name order (empty if none were recorded)."""
+    pages = []
+    for path in sorted(glob.glob(os.path.join(directory, f"{kind}_*.json"))):
+        with open(path, 'rb') as file:
+            pages.append(json.load(file))
+    return pages
+
+
+def pages(kind, count=10, directory=FIXTURES_DIR, **kwargs):
+    """Recorded pages of `kind` if any exist, otherwise `count` synthesised ones."""
+    return recorded(kind, directory) or [GENERATORS[kind](page, pages=count, **kwargs) for page in range(count)]
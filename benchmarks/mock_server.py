@@ -0,0 +1,201 @@
+"""Local stand-in for the RapidAPI and x.com endpoints the scrapers call.
+
+Serves /user, /user-tweets, /comments, /quotes and the GraphQL Retweeters
+timeline from recorded pages when there are any (see benchmarks.fixtures),
+synthesised ones otherwise. Point the app at it with HTTP_BASE_URL:
+
+    python -m benchmarks.mock_server --port 8765 --latency 0.05 --every-429 50
+    HTTP_BASE_URL=http://127.0.0.1:8765 python app.py
+"""
+import argparse
+import json
+import threading
+import time
+import urllib.parse
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks import fixtures
+
+
+class MockConfig:
+    def __init__(self, latency=0.0, pages=10, every_429=0, retry_after=1, quota=100_000, window=60,
+                 max_page_size=None, entry_latency=0.0, every_500=0, every_html=0):
+        # Seconds added before every response
+        self.latency = latency
+        # Pages per timeline before the bottom cursor runs out
+        self.pages = pages
+        # Answer every Nth request with a 429 (0 = never)
+        self.every_429 = every_429
+        self.retry_after = retry_after
+        # Advertised in x-ratelimit-requests-* headers: `quota` requests per `window` seconds, 429 once spent
+        self.quota = quota
+        self.window = window
+        # Synthesised pages hold the requested count, capped here like the real API caps it (None = no cap)
+        self.max_page_size = max_page_size
+        # Seconds added per entry, so bigger pages take longer
+        self.entry_latency = entry_latency
+        # Answer every Nth request with a 500, or with a 200 HTML error page (0 = never)
+        self.every_500 = every_500
+        self.every_html = every_html
+
+
+def _page_number(cursor):
+    return int(cursor.split("-")[1]) if cursor else 0
+
+
+def _seed(tweet_id):
+    return zlib.crc32(str(tweet_id).encode())
+
+
+class MockServer:
+    """The mock API on a background thread; counts the requests it answers."""
+
+    def __init__(self, config=None, host="127.0.0.1", port=0):
+        self.config = config or MockConfig()
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.rate_limited = 0
+        self.failed = 0
+        self.window_start = time.monotonic()
+        self.window_requests = 0
+        self.recorded = {kind: fixtures.recorded(kind) for kind in (*fixtures.GENERATORS, "user_tweets")}
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                server.handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="mock-server", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def _page(self, kind, page, seed, count=None):
+        recorded = self.recorded.get(kind)
+        if recorded:
+            return recorded[page] if page < len(recorded) else recorded[-1]
+        if not count:
+            return fixtures.GENERATORS[kind](page, pages=self.config.pages, seed=seed)
+        per_page = min(int(count), self.config.max_page_size or int(count))
+        time.sleep(self.config.entry_latency * per_page)
+        return fixtures.GENERATORS[kind](page, per_page=per_page, pages=self.config.pages, seed=seed)
+
+    def route(self, path, query):
+        if path == "/user":
+            return fixtures.user_lookup(query.get("username", ""))
+        if path == "/user-tweets":
+            recorded = self.recorded["user_tweets"]
+            return recorded[0] if recorded else fixtures.user_tweets_page(int(query.get("count", 10)), seed=_seed(query.get("user")))
+        if path == "/comments":
+            return self._page("comments", _page_number(query.get("cursor")), _seed(query.get("pid")), query.get("count"))
+        if path == "/quotes":
+            return self._page("quotes", _page_number(query.get("cursor")), _seed(query.get("pid")), query.get("count"))
+        if path.endswith("/Retweeters"):
+            variables = json.loads(query.get("variables", "{}"))
+            return self._page("retweeters", _page_number(variables.get("cursor")), _seed(variables.get("tweetId")),
+                              variables.get("count"))
+        return None
+
+    def handle(self, request):
+        with self.lock:
+            self.requests += 1
+            now = time.monotonic()
+            if now - self.window_start >= self.config.window:
+                self.window_start, self.window_requests = now, 0
+            self.window_requests += 1
+            quota_headers = {
+                "x-ratelimit-requests-limit": str(self.config.quota),
+                "x-ratelimit-requests-remaining": str(max(self.config.quota - self.window_requests, 0)),
+                "x-ratelimit-requests-reset": str(int(self.window_start + self.config.window - now)),
+            }
+            spent = self.window_requests > self.config.quota
+            throttle = spent or (self.config.every_429 and self.requests % self.config.every_429 == 0)
+            if throttle:
+                self.rate_limited += 1
+            fail = not throttle and self.config.every_500 and self.requests % self.config.every_500 == 0
+            garbage = not throttle and self.config.every_html and self.requests % self.config.every_html == 0
+            if fail or garbage:
+                self.failed += 1
+        if self.config.latency:
+            time.sleep(self.config.latency)
+
+        url = urllib.parse.urlsplit(request.path)
+        if throttle:
+            # Like RapidAPI, a spent quota only points at its reset
+            retry_after = {} if spent else {"Retry-After": str(self.config.retry_after)}
+            self._send(request, 429, b'{"message": "Too Many Requests"}', {**retry_after, **quota_headers})
+            return
+        if fail:
+            self._send(request, 500, b'{"message": "Internal Server Error"}', quota_headers)
+            return
+        if garbage:
+            self._send(request, 200, b"<html><body>Something went wrong</body></html>", quota_headers, "text/html")
+            return
+        data = self.route(url.path, dict(urllib.parse.parse_qsl(url.query)))
+        if data is None:
+            self._send(request, 404, b'{"message": "Not Found"}', quota_headers)
+        else:
+            self._send(request, 200, json.dumps(data).encode(), quota_headers)
+
+    def _send(self, request, status, body, headers=None, content_type="application/json"):
+        request.send_response(status)
+        request.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        request.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            request.send_header(name, value)
+        request.end_headers()
+        request.wfile.write(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--pages", type=int, default=10, help="pages per timeline")
+    parser.add_argument("--every-429", type=int, default=0, help="rate-limit every Nth request")
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--quota", type=int, default=100_000, help="requests allowed per minute")
+    parser.add_argument("--max-page-size", type=int, help="entries per page at most, whatever count is asked")
+    parser.add_argument("--entry-latency", type=float, default=0.0, help="seconds added per page entry")
+    parser.add_argument("--every-500", type=int, default=0, help="answer every Nth request with a 500")
+    parser.add_argument("--every-html", type=int, default=0, help="answer every Nth request with an HTML error page")
+    args = parser.parse_args()
+
+    config = MockConfig(args.latency, args.pages, args.every_429, args.retry_after, args.quota,
+                        max_page_size=args.max_page_size, entry_latency=args.entry_latency,
+                        every_500=args.every_500, every_html=args.every_html)
+    server = MockServer(config, port=args.port)
+    print(f"Mock API on {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
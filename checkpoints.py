@@ -0,0 +1,200 @@
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_DB = os.getenv('CHECKPOINT_DB', 'checkpoints.db')
+# A checkpoint another process hasn't saved for this long belongs to a scrape that died and is taken over
+LEASE_SECONDS = float(os.getenv('CHECKPOINT_LEASE_SECONDS', 600))
+
+
+class Checkpoint:
+    __slots__ = ("cursor", "seen_ids", "rows_written", "done")
+
+    def __init__(self, cursor, seen_ids, rows_written, done):
+        self.cursor = cursor
+        self.seen_ids = seen_ids
+        self.rows_written = rows_written
+        self.done = done
+
+
+class Lease:
+    """One scrape's hold on the checkpoint of (tweet, source, folder).
+
+    `checkpoint` is the unfinished progress to resume from, if any. When
+    another live scrape holds the checkpoint, `owned` is False and save() and
+    finish() do nothing: this scrape pages from the start without
+    checkpointing. Use it as a context manager so the hold is released.
+    """
+
+    def __init__(self, store, key, owner, checkpoint=None):
+        self.store = store
+        self.key = key
+        self.owner = owner
+        self.checkpoint = checkpoint
+
+    @property
+    def owned(self):
+        return self.owner is not None
+
+    def save(self, cursor, new_ids, rows_written):
+        """Record a processed page: the cursor of the next page and the ids it added."""
+        if self.owner is not None and not self.store._save(self.key, self.owner, cursor, new_ids, rows_written):
+            logger.warning(f"Checkpoint of {self.key[:2]} was taken over, no longer saving it")
+            self.owner = None
+
+    def finish(self):
+        """Mark the checkpoint as fully paged; its seen ids are no longer needed."""
+        if self.owner is not None:
+            self.store._finish(self.key, self.owner)
+
+    def release(self):
+        if self.owner is not None:
+            self.store._release(self.key, self.owner)
+            self.owner = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class CheckpointStore:
+    """Pagination progress per (tweet, source, output folder), kept in SQLite.
+
+    Stores the cursor of the next page, the ids already seen and how many
+    rows were written, so a restarted scrape picks up where the last one
+    stopped instead of paging from the start again. Each checkpoint is held
+    by the scrape writing it; only checkpoints whose scrape is gone are
+    resumed, so concurrent jobs on the same tweet never share one.
+    """
+
+    def __init__(self, path=CHECKPOINT_DB):
+        self.path = path
+        self.local = threading.local()
+        # Owners in this process are alive exactly while they are in `active`
+        self.process = f"{socket.gethostname()}:{os.getpid()}"
+        self.active = set()
+        self.active_lock = threading.Lock()
+        with self._conn() as conn:
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(checkpoints)")]
+            if columns and "owner" not in columns:
+                # Checkpoints from before folders and owners were tracked can't be attributed; start over
+                conn.execute("DROP TABLE checkpoints")
+                conn.execute("DROP TABLE IF EXISTS checkpoint_seen")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS checkpoints (
+                    tweet_id TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    folder TEXT NOT NULL,
+                    cursor TEXT,
+                    rows_written INTEGER NOT NULL DEFAULT 0,
+                    done INTEGER NOT NULL DEFAULT 0,
+                    owner TEXT,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (tweet_id, source, folder)
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS checkpoint_seen (
+                    tweet_id TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    folder TEXT NOT NULL,
+                    item_id TEXT NOT NULL,
+                    PRIMARY KEY (tweet_id, source, folder, item_id)
+                ) WITHOUT ROWID
+            """)
+
+    def _conn(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+        return conn
+
+    def _held(self, owner, updated_at):
+        """Whether the scrape `owner` is still running."""
+        if not owner:
+            return False
+        if owner.rpartition(":")[0] == self.process:
+            with self.active_lock:
+                return owner in self.active
+        return time.time() - updated_at < LEASE_SECONDS
+
+    def claim(self, tweet_id, source, folder):
+        """Take the checkpoint of (tweet_id, source, folder) for one scrape. Returns its Lease."""
+        key = (tweet_id, source, os.path.abspath(folder))
+        owner = f"{self.process}:{uuid.uuid4().hex}"
+        conn = self._conn()
+        with conn:
+            # Checking the holder and taking over must not interleave with another claim
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT cursor, rows_written, done, owner, updated_at FROM checkpoints "
+                "WHERE tweet_id = ? AND source = ? AND folder = ?",
+                key,
+            ).fetchone()
+            if row is not None and not row[2] and self._held(row[3], row[4]):
+                logger.info(f"Another scrape is paging {source} of {tweet_id} into {folder}, not checkpointing this one")
+                return Lease(self, key, None)
+            resumable = row is not None and not row[2]
+            if not resumable:
+                conn.execute("DELETE FROM checkpoints WHERE tweet_id = ? AND source = ? AND folder = ?", key)
+                conn.execute("DELETE FROM checkpoint_seen WHERE tweet_id = ? AND source = ? AND folder = ?", key)
+            conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (tweet_id, source, folder, cursor, rows_written, done, owner, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, 0, ?, ?)",
+                (*key, row[0] if resumable else None, row[1] if resumable else 0, owner, time.time()),
+            )
+        with self.active_lock:
+            self.active.add(owner)
+        if not resumable:
+            return Lease(self, key, owner)
+        seen_ids = set(
+            int(item_id) for (item_id,) in conn.execute(
+                "SELECT item_id FROM checkpoint_seen WHERE tweet_id = ? AND source = ? AND folder = ?",
+                key,
+            )
+        )
+        return Lease(self, key, owner, Checkpoint(row[0], seen_ids, row[1], False))
+
+    def _save(self, key, owner, cursor, new_ids, rows_written):
+        with self._conn() as conn:
+            saved = conn.execute(
+                "UPDATE checkpoints SET cursor = ?, rows_written = ?, updated_at = ? "
+                "WHERE tweet_id = ? AND source = ? AND folder = ? AND owner = ?",
+                (cursor, rows_written, time.time(), *key, owner),
+            ).rowcount
+            if saved:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO checkpoint_seen (tweet_id, source, folder, item_id) VALUES (?, ?, ?, ?)",
+                    ((*key, item_id) for item_id in new_ids),
+                )
+        return bool(saved)
+
+    def _finish(self, key, owner):
+        with self._conn() as conn:
+            finished = conn.execute(
+                "UPDATE checkpoints SET done = 1, cursor = NULL, updated_at = ? "
+                "WHERE tweet_id = ? AND source = ? AND folder = ? AND owner = ?",
+                (time.time(), *key, owner),
+            ).rowcount
+            if finished:
+                conn.execute("DELETE FROM checkpoint_seen WHERE tweet_id = ? AND source = ? AND folder = ?", key)
+
+    def _release(self, key, owner):
+        with self.active_lock:
+            self.active.discard(owner)
+        with self._conn() as conn:
+            conn.execute(
+                "UPDATE checkpoints SET owner = NULL WHERE tweet_id = ? AND source = ? AND folder = ? AND owner = ?",
+                (*key, owner),
+            )
@@ -0,0 +1,59 @@
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Parquet is an export of the combined CSVs, which stay the store that merge and dedup run on.
+# Off unless PARQUET_EXPORT=1 and pyarrow (requirements-parquet.txt) is installed; pyarrow pulls
+# in numpy, so it is never imported otherwise.
+EXPORT = os.getenv('PARQUET_EXPORT', '0').lower() in ('1', 'true', 'yes')
+_pyarrow = None
+
+
+def _arrow():
+    """Import pyarrow on first use; returns (pa, pq, pcsv) or None if it isn't installed."""
+    global _pyarrow
+    if _pyarrow is None:
+        try:
+            import pyarrow as pa
+            import pyarrow.csv as pcsv
+            import pyarrow.parquet as pq
+            _pyarrow = (pa, pq, pcsv)
+        except ImportError:
+            logger.info("pyarrow not installed, skipping Parquet output")
+            _pyarrow = False
+    return _pyarrow or None
+
+
+def available():
+    return _arrow() is not None
+
+
+def enabled():
+    """Whether finalize() should write Parquet; only imports pyarrow when the export is switched on."""
+    return EXPORT and available()
+
+
+def schema():
+    pa, _, _ = _arrow()
+    return pa.schema([
+        ("username", pa.string()),
+        ("name", pa.string()),
+        ("id", pa.int64()),
+        ("followers_count", pa.int64()),
+    ])
+
+
+def export_csv(csv_path, parquet_path):
+    """Write the engagement CSV at `csv_path` as a typed Parquet file; skipped while it is up to date.
+
+    The CSV is parsed by Arrow's own reader straight into the typed columns.
+    """
+    if os.path.exists(parquet_path) and os.path.getmtime(parquet_path) >= os.path.getmtime(csv_path):
+        return parquet_path
+    _, pq, pcsv = _arrow()
+    table = pcsv.read_csv(csv_path, convert_options=pcsv.ConvertOptions(column_types=schema()))
+    tmp_path = f"{parquet_path}.tmp"
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, parquet_path)
+    return parquet_path
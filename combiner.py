@@ -0,0 +1,148 @@
+import csv
+import io
+import json
+import os
+import re
+import threading
+
+import columnar
+from sinks import FIELDNAMES
+
+# Per-tweet output files of each source
+SOURCE_FILES = {
+    "retweeters": re.compile(r"^tweet_\d+_data\.csv$"),
+    "commenters": re.compile(r"^tweet_commenters_\d+_data\.csv$"),
+    "quoters": re.compile(r"^tweet_quoters_\d+_data\.csv$"),
+}
+
+
+class IncrementalCombiner:
+    """Keeps the combined_* files of one folder up to date by appending only new rows.
+
+    For every per-tweet file we remember how many bytes were already merged,
+    so a merge only reads what the last fetch appended. Ids already written to
+    combined_all_data are kept in a set backed by an append-only index file.
+    Both survive restarts; if the state file is missing the combined files
+    are rebuilt once from the per-tweet files in the folder.
+
+    The CSVs are the store. With PARQUET_EXPORT set, finalize() also
+    exports each combined CSV as a typed Parquet file next to it; that is an
+    output only, nothing is read back from it.
+    """
+
+    def __init__(self, folder, label):
+        self.folder = folder
+        self.label = label
+        self.state_path = os.path.join(folder, f".combine_{label}.json")
+        self.ids_path = os.path.join(folder, f".combined_all_{label}.ids")
+        self.lock = threading.Lock()
+        self.offsets = {}
+        self.ids = set()
+
+        with self.lock:
+            if os.path.exists(self.state_path):
+                with open(self.state_path, 'r', encoding='utf-8') as file:
+                    self.offsets = json.load(file)["offsets"]
+                if os.path.exists(self.ids_path):
+                    with open(self.ids_path, 'r', encoding='utf-8') as file:
+                        self.ids = set(line.strip() for line in file if line.strip())
+            else:
+                self._rebuild()
+
+    def combined_file(self, source):
+        return os.path.join(self.folder, f"combined_{source}_{self.label}.csv")
+
+    def combined_all_file(self):
+        return os.path.join(self.folder, f"combined_all_data_{self.label}.csv")
+
+    def _rebuild(self):
+        for path in [self.combined_all_file(), self.ids_path] + [self.combined_file(s) for s in SOURCE_FILES]:
+            if os.path.exists(path):
+                os.remove(path)
+        for name in sorted(os.listdir(self.folder)):
+            for source, pattern in SOURCE_FILES.items():
+                if pattern.match(name):
+                    self._merge(source, os.path.join(self.folder, name))
+        self._save_state()
+
+    def _save_state(self):
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump({"offsets": self.offsets}, file)
+        os.replace(tmp_path, self.state_path)
+
+    def _read_new_rows(self, path):
+        key = os.path.basename(path)
+        offset = self.offsets.get(key, 0)
+        with open(path, 'rb') as file:
+            file.seek(offset)
+            data = file.read()
+        if not data:
+            return []
+        self.offsets[key] = offset + len(data)
+        rows = list(csv.DictReader(io.StringIO(data.decode('utf-8'), newline=''), fieldnames=FIELDNAMES))
+        # The header is only at the start of the file
+        return rows[1:] if offset == 0 else rows
+
+    def _append(self, path, rows):
+        file_exists = os.path.isfile(path)
+        with open(path, 'a', encoding="utf-8", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=FIELDNAMES)
+            if not file_exists:
+                writer.writeheader()
+            writer.writerows(rows)
+
+    def _merge(self, source, path):
+        if not os.path.exists(path):
+            return []
+        rows = self._read_new_rows(path)
+        if not rows:
+            return rows
+        self._append(self.combined_file(source), rows)
+
+        new_rows = []
+        for row in rows:
+            if row["id"] not in self.ids:
+                self.ids.add(row["id"])
+                new_rows.append(row)
+        if new_rows:
+            self._append(self.combined_all_file(), new_rows)
+            with open(self.ids_path, 'a', encoding='utf-8') as file:
+                file.writelines(f"{row['id']}\n" for row in new_rows)
+        return rows
+
+    def merge(self, source, path):
+        """Append the rows added to `path` since the last merge. Returns the combined file of `source`."""
+        with self.lock:
+            self._merge(source, path)
+            self._save_state()
+            output_file = self.combined_file(source)
+            return output_file if os.path.exists(output_file) else None
+
+    def _write_parquet(self):
+        for path in [self.combined_file(source) for source in SOURCE_FILES] + [self.combined_all_file()]:
+            if os.path.exists(path):
+                columnar.export_csv(path, f"{os.path.splitext(path)[0]}.parquet")
+
+    def finalize(self):
+        """Return the deduplicated combined_all_data file, if anything was merged."""
+        with self.lock:
+            if columnar.enabled():
+                self._write_parquet()
+            output_file = self.combined_all_file()
+            return output_file if os.path.exists(output_file) else None
+
+
+_combiners = {}
+_combiners_lock = threading.Lock()
+
+
+def combiner_for(folder, label):
+    """Return the process-wide combiner for (folder, label)."""
+    key = (os.path.abspath(folder), label)
+    with _combiners_lock:
+        combiner = _combiners.get(key)
+        if combiner is None:
+            combiner = IncrementalCombiner(folder, label)
+            _combiners[key] = combiner
+        return combiner
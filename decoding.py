@@ -0,0 +1,99 @@
+import json
+import logging
+import os
+import zlib
+
+import zstandard as zstd
+
+logger = logging.getLogger(__name__)
+
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+GZIP_MAGIC = b'\x1f\x8b'
+
+# Bytes read from the socket at a time when decoding a streamed response
+CHUNK_SIZE = int(os.getenv('DECODE_CHUNK_SIZE', 64 * 1024))
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# JSON backend: "orjson" when it is installed, otherwise the standard library
+JSON_BACKEND = os.getenv('JSON_BACKEND', 'orjson' if orjson else 'json')
+
+# Codecs we can undo ourselves; advertise only these so the server never picks one we can't read
+ACCEPT_ENCODING = "gzip, deflate, zstd"
+
+
+def _backend(name):
+    if name == "orjson":
+        if orjson is None:
+            logger.warning("orjson not installed, using json")
+            return json.loads
+        return orjson.loads
+    return json.loads
+
+
+loads = _backend(JSON_BACKEND)
+
+
+def set_backend(name):
+    """Switch the JSON parser ("orjson" or "json") used by every decode."""
+    global loads
+    loads = _backend(name)
+
+
+def _decompressor(head, content_encoding):
+    """Pick the codec from the body's first bytes; the header only for deflate, which has no magic."""
+    if head.startswith(ZSTD_MAGIC):
+        return zstd.ZstdDecompressor().decompressobj()
+    if head.startswith(GZIP_MAGIC):
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
+    if content_encoding == "deflate":
+        return zlib.decompressobj()
+    return None
+
+
+def _decode_chunks(chunks, content_encoding=None):
+    """Decompress an iterable of body chunks in one pass and parse the JSON."""
+    chunks = iter(chunks)
+    head = b""
+    for chunk in chunks:
+        head += chunk
+        if len(head) >= len(ZSTD_MAGIC):
+            break
+    decompressor = _decompressor(head, (content_encoding or "").strip().lower())
+    try:
+        if decompressor is None:
+            body = head + b"".join(chunks)
+        else:
+            body = bytearray(decompressor.decompress(head))
+            for chunk in chunks:
+                body += decompressor.decompress(chunk)
+            body += decompressor.flush()
+    except (zstd.ZstdError, zlib.error) as e:
+        raise ValueError(f"Failed to decompress response: {e}") from e
+    return loads(body)
+
+
+def decode_body(data, content_encoding=None):
+    """Parse a response body that may be zstd, gzip or deflate compressed."""
+    return _decode_chunks((data,), content_encoding)
+
+
+def read_json(response):
+    """Decode and parse `response`'s JSON body.
+
+    Responses requested with stream=True are decompressed straight off the
+    socket, chunk by chunk, without holding the compressed body as well.
+    Bodies that were already read are decoded from memory; requests has
+    undone any encoding it knows by then, so only the magic bytes count.
+    Raises ValueError if the body can't be decompressed or parsed.
+    """
+    if getattr(response, "_content_consumed", True) or response.raw is None:
+        return decode_body(response.content)
+    try:
+        chunks = response.raw.stream(CHUNK_SIZE, decode_content=False)
+        return _decode_chunks(chunks, response.headers.get("Content-Encoding"))
+    finally:
+        response.close()
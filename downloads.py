@@ -0,0 +1,67 @@
+import gzip
+import os
+import shutil
+import threading
+
+import zstandard as zstd
+
+# Downloads are served from below this folder only (the scrape output folders live here)
+DOWNLOAD_ROOT = os.path.abspath(os.getenv('DOWNLOAD_ROOT', '.'))
+DOWNLOADABLE = ('.csv', '.parquet')
+# Parquet is compressed already; encoding it again only costs CPU
+COMPRESSIBLE = ('.csv',)
+# Smaller files are sent as they are
+MIN_COMPRESS_SIZE = int(os.getenv('DOWNLOAD_MIN_COMPRESS_SIZE', 1024))
+
+# Encodings in order of preference, with the suffix of the cached copy next to the file
+ENCODINGS = {"zstd": ".zst", "gzip": ".gz"}
+
+_locks = {}
+_locks_lock = threading.Lock()
+
+
+def resolve(filename):
+    """Absolute path of a downloadable file below DOWNLOAD_ROOT, or None."""
+    path = os.path.realpath(os.path.join(DOWNLOAD_ROOT, filename))
+    if os.path.commonpath([path, DOWNLOAD_ROOT]) != DOWNLOAD_ROOT:
+        return None
+    if not path.endswith(DOWNLOADABLE) or not os.path.isfile(path):
+        return None
+    return path
+
+
+def encodings_for(path):
+    """Encodings worth offering for `path`, most preferred first."""
+    if not path.endswith(COMPRESSIBLE) or os.path.getsize(path) < MIN_COMPRESS_SIZE:
+        return []
+    return list(ENCODINGS)
+
+
+def _compress(path, encoding, target):
+    tmp_path = f"{target}.tmp"
+    with open(path, 'rb') as source, open(tmp_path, 'wb') as out:
+        if encoding == "zstd":
+            zstd.ZstdCompressor(level=10).copy_stream(source, out)
+        else:
+            # mtime=0 keeps the output, and so its ETag, the same for the same input
+            with gzip.GzipFile(fileobj=out, mode='wb', compresslevel=9, mtime=0) as gz:
+                shutil.copyfileobj(source, gz)
+    # Carry the source mtime over so the cached copy's Last-Modified matches the file
+    stat = os.stat(path)
+    os.utime(tmp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    os.replace(tmp_path, target)
+
+
+def encoded(path, encoding):
+    """Path of the `encoding` copy of `path`, compressing it first if it is missing or stale.
+
+    The copy is cached next to the file and rebuilt whenever the file has
+    changed since, e.g. when a scrape appended rows to a combined CSV.
+    """
+    target = path + ENCODINGS[encoding]
+    with _locks_lock:
+        lock = _locks.setdefault(target, threading.Lock())
+    with lock:
+        if not os.path.exists(target) or os.stat(target).st_mtime_ns != os.stat(path).st_mtime_ns:
+            _compress(path, encoding, target)
+    return target
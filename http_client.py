@@ -0,0 +1,137 @@
+import hashlib
+import os
+import threading
+import time
+import urllib.parse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import metrics
+from rate_limiter import RateLimiter
+
+# Hosts every fetcher talks to. Each gets its own keep-alive pool.
+TWITTER241_HOST = "twitter241.p.rapidapi.com"
+TWITTER_X_HOST = "twitter-x.p.rapidapi.com"
+X_HOST = "x.com"
+
+POOL_CONNECTIONS = int(os.getenv('HTTP_POOL_CONNECTIONS', 4))
+POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', 16))
+REQUEST_TIMEOUT = float(os.getenv('HTTP_TIMEOUT', 30))
+# How many times a request is retried after a 429 before it is handed back
+MAX_RATE_LIMIT_RETRIES = int(os.getenv('HTTP_MAX_429_RETRIES', 3))
+# Send every host's requests to this base URL instead, e.g. http://127.0.0.1:8765
+# for the benchmark mock server (benchmarks/mock_server.py)
+BASE_URL_OVERRIDE = os.getenv('HTTP_BASE_URL')
+
+limiter = RateLimiter()
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def base_url(host):
+    """Return the scheme + host prefix used for requests to `host`."""
+    return BASE_URL_OVERRIDE or f"https://{host}"
+
+
+def get_session(host):
+    """Return the shared keep-alive session for `host`, creating it on first use."""
+    session = _sessions.get(host)
+    if session is not None:
+        return session
+    with _sessions_lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=POOL_CONNECTIONS,
+                pool_maxsize=POOL_MAXSIZE,
+                pool_block=True,
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _sessions[host] = session
+    return session
+
+
+def _endpoint(path):
+    """Metrics label for `path`: the path without its query, GraphQL operations by name."""
+    path = urllib.parse.urlsplit(path).path
+    if "/graphql/" in path:
+        return f"graphql/{path.rsplit('/', 1)[-1]}"
+    return path
+
+
+# Salt of the key digests used as account labels; fixed so a key keeps its label across restarts
+_KEY_LABEL_SALT = b"twitter-scraper/rate-limit-account"
+
+
+def _account_from_headers(headers):
+    """Quota owner for requests that don't name an account: the RapidAPI key.
+
+    It is labelled by a short salted digest, since the label shows up on
+    /metrics and /stats; no part of the key itself leaves the process.
+    """
+    key = (headers or {}).get('x-rapidapi-key')
+    if not key:
+        return None
+    return f"key:{hashlib.sha256(_KEY_LABEL_SALT + key.encode()).hexdigest()[:8]}"
+
+
+def allowed_rate(host, account=None, headers=None):
+    """Requests per second the limiter currently allows `host` as `account` (or the headers' key)."""
+    return limiter.bucket(host, account or _account_from_headers(headers)).rate
+
+
+def get(host, path, headers=None, account=None, **kwargs):
+    """GET `path` on `host` through that host's shared connection pool.
+
+    Every call waits on the (host, account) rate limiter first, and 429s are
+    retried once the limiter lets us through again.
+    """
+    kwargs.setdefault("timeout", REQUEST_TIMEOUT)
+    url = f"{base_url(host)}{path}"
+    account = account or _account_from_headers(headers)
+    session = get_session(host)
+    endpoint = _endpoint(path)
+    for _ in range(MAX_RATE_LIMIT_RETRIES + 1):
+        wait = limiter.acquire(host, account)
+        if wait > 0:
+            metrics.RATE_LIMIT_WAITS.inc(host)
+            metrics.RATE_LIMIT_WAIT_SECONDS.inc(host, amount=wait)
+        start = time.perf_counter()
+        response = session.get(url, headers=headers, **kwargs)
+        metrics.HTTP_LATENCY.observe(time.perf_counter() - start, endpoint, account or "-")
+        metrics.HTTP_RESPONSES.inc(endpoint, response.status_code)
+        limiter.observe(host, account, response)
+        if response.status_code != 429:
+            break
+        # Read the small error body so a streamed response hands its connection back to the pool
+        _ = response.content
+    return response
+
+
+def pool_stats():
+    """Connection counts per host: pools, connections opened and requests sent."""
+    stats = {}
+    with _sessions_lock:
+        sessions = dict(_sessions)
+    for host, session in sessions.items():
+        adapter = session.get_adapter(base_url(host))
+        pools = list(adapter.poolmanager.pools._container.values())
+        stats[host] = {
+            "pools": len(pools),
+            "max_pool_size": POOL_MAXSIZE,
+            "connections_opened": sum(pool.num_connections for pool in pools),
+            "requests_sent": sum(pool.num_requests for pool in pools),
+        }
+    return stats
+
+
+def close_all():
+    """Close every pooled connection (used on shutdown)."""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
@@ -0,0 +1,174 @@
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', 2))
+# Finished jobs are kept this many seconds for status and late subscribers
+JOB_TTL = float(os.getenv('JOB_TTL', 3600))
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class Job:
+    """One scrape, its progress events and the threads waiting on them."""
+
+    def __init__(self, key, client, user_input, options=None):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.client = client
+        self.user_input = user_input
+        self.options = options or {}
+        self.status = QUEUED
+        self.events = []
+        self.created = time.time()
+        self.finished = None
+        self.condition = threading.Condition()
+
+    @property
+    def in_flight(self):
+        return self.status in (QUEUED, RUNNING)
+
+    def publish(self, event):
+        with self.condition:
+            self.events.append(event)
+            self.condition.notify_all()
+
+    def finish(self, status):
+        with self.condition:
+            self.status = status
+            self.finished = time.time()
+            self.condition.notify_all()
+
+    def subscribe(self, start=0, timeout=15):
+        """Yield (index, event) from `start` on until the job ends.
+
+        Yields (None, None) every `timeout` seconds without news so callers
+        can send keep-alives.
+        """
+        index = start
+        while True:
+            with self.condition:
+                if index >= len(self.events) and self.in_flight:
+                    self.condition.wait(timeout)
+                events = self.events[index:]
+                in_flight = self.in_flight
+            for event in events:
+                yield index, event
+                index += 1
+            if not in_flight and index >= len(self.events):
+                return
+            if not events:
+                yield None, None
+
+    def summary(self):
+        with self.condition:
+            return {
+                "job_id": self.id,
+                "input": self.user_input,
+                "options": self.options,
+                "status": self.status,
+                "events": len(self.events),
+                "last_event": self.events[-1] if self.events else None,
+                "created": self.created,
+                "finished": self.finished,
+            }
+
+
+class JobManager:
+    """Runs jobs on a bounded worker pool, decoupled from the requests that started them.
+
+    Each client has its own queue and workers take from the queues round-robin,
+    so one client submitting many jobs can't starve the others. Submitting a
+    job whose key matches one that is still queued or running returns the
+    existing job instead of doing the work twice.
+    """
+
+    def __init__(self, run, workers=JOB_WORKERS):
+        self.run = run
+        self.workers = workers
+        self.jobs = OrderedDict()
+        self.in_flight = {}
+        self.queues = OrderedDict()
+        self.lock = threading.Lock()
+        self.has_work = threading.Condition(self.lock)
+        self.threads = []
+
+    def _start(self):
+        while len(self.threads) < self.workers:
+            thread = threading.Thread(target=self._work, name=f"job-worker-{len(self.threads)}", daemon=True)
+            self.threads.append(thread)
+            thread.start()
+
+    def _prune(self):
+        now = time.time()
+        for job_id in [job_id for job_id, job in self.jobs.items() if job.finished and now - job.finished > JOB_TTL]:
+            del self.jobs[job_id]
+
+    def submit(self, key, client, user_input, options=None):
+        """Queue a job for `user_input`, or return the in-flight job with the same key.
+
+        `options` are passed to `run` as keyword arguments; they should be part of the key.
+        """
+        with self.lock:
+            self._start()
+            self._prune()
+            job = self.in_flight.get(key)
+            if job is not None:
+                return job
+            job = Job(key, client, user_input, options)
+            self.jobs[job.id] = job
+            self.in_flight[key] = job
+            self.queues.setdefault(client, deque()).append(job)
+            self.has_work.notify()
+            return job
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def _next_job(self):
+        # Round-robin across clients: take from the first queue, then move it to the back
+        with self.lock:
+            while not self.queues:
+                self.has_work.wait()
+            client, queue = next(iter(self.queues.items()))
+            job = queue.popleft()
+            del self.queues[client]
+            if queue:
+                self.queues[client] = queue
+            job.status = RUNNING
+            return job
+
+    def _work(self):
+        while True:
+            job = self._next_job()
+            status = DONE
+            try:
+                for event in self.run(job.user_input, **job.options):
+                    job.publish(event)
+                    # Errors of single sources are reported mid-stream; only a final error fails the job
+                    status = FAILED if event.get("status") == "error" else DONE
+            except Exception as e:
+                logger.error(f"Job {job.id} failed: {e}", exc_info=True)
+                job.publish({"status": "error", "message": str(e)})
+                status = FAILED
+            finally:
+                with self.lock:
+                    if self.in_flight.get(job.key) is job:
+                        del self.in_flight[job.key]
+                job.finish(status)
+
+    def stats(self):
+        with self.lock:
+            return {
+                "workers": self.workers,
+                "queued": sum(len(queue) for queue in self.queues.values()),
+                "running": sum(1 for job in self.in_flight.values() if job.status == RUNNING),
+                "clients_waiting": len(self.queues),
+                "jobs": len(self.jobs),
+            }
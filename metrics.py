@@ -0,0 +1,103 @@
+import bisect
+import threading
+
+# Upper bounds (seconds) of the request latency histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values):
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+class Counter:
+    """Monotonic total per label combination."""
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self.lock:
+            for labels, value in sorted(self.values.items()):
+                lines.append(f"{self.name}{_labels(self.labels, labels)} {value}")
+        return lines
+
+
+class Histogram:
+    """Bucketed observations per label combination, rendered cumulatively like Prometheus expects."""
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        with self.lock:
+            series = self.values.get(labels)
+            if series is None:
+                # Per-bucket counts (the last one is +Inf), then sum and count
+                series = self.values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][bisect.bisect_left(self.buckets, value)] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        names = self.labels + ("le",)
+        with self.lock:
+            for labels, (counts, total, count) in sorted(self.values.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + ("+Inf",), counts):
+                    cumulative += bucket_count
+                    lines.append(f"{self.name}_bucket{_labels(names, labels + (bound,))} {cumulative}")
+                lines.append(f"{self.name}_sum{_labels(self.labels, labels)} {total}")
+                lines.append(f"{self.name}_count{_labels(self.labels, labels)} {count}")
+        return lines
+
+
+HTTP_LATENCY = Histogram(
+    "scraper_http_request_duration_seconds", "Upstream request latency.", ("endpoint", "account"))
+HTTP_RESPONSES = Counter(
+    "scraper_http_responses_total", "Upstream responses by status code.", ("endpoint", "status"))
+RATE_LIMIT_WAITS = Counter(
+    "scraper_rate_limit_waits_total", "Requests that had to wait for the rate limiter.", ("host",))
+RATE_LIMIT_WAIT_SECONDS = Counter(
+    "scraper_rate_limit_wait_seconds_total", "Time spent waiting for the rate limiter.", ("host",))
+PAGES = Counter(
+    "scraper_pages_total", "Timeline pages processed.", ("source",))
+USERS = Counter(
+    "scraper_users_total", "Unique engaged users found.", ("source",))
+CACHE_LOOKUPS = Counter(
+    "scraper_response_cache_lookups_total", "Response cache lookups by outcome.", ("path", "outcome"))
+RETRIES = Counter(
+    "scraper_retries_total", "Requests retried after a failure, by error class.", ("host", "error"))
+CIRCUIT_REJECTIONS = Counter(
+    "scraper_circuit_rejections_total", "Requests not sent because a circuit breaker was open.", ("breaker",))
+
+REGISTRY = [HTTP_LATENCY, HTTP_RESPONSES, RATE_LIMIT_WAITS, RATE_LIMIT_WAIT_SECONDS, PAGES, USERS, CACHE_LOOKUPS,
+            RETRIES, CIRCUIT_REJECTIONS]
+
+
+def render():
+    """All metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
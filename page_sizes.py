@@ -0,0 +1,105 @@
+import os
+import threading
+
+# Pages fetched with every candidate count before the sizer starts picking the best one
+SAMPLES_PER_COUNT = int(os.getenv('PAGE_SIZE_SAMPLES', 2))
+# One page in this many re-measures a count that isn't the current best, in case the API changed
+EXPLORE_EVERY = int(os.getenv('PAGE_SIZE_EXPLORE_EVERY', 25))
+# Weight of the newest page in the running averages
+SMOOTHING = 0.2
+# Counts whose throughput is within this fraction of the best one count as equally good
+TIE_TOLERANCE = 0.05
+
+
+class CountStats:
+    """Running averages for one `count` value: users per page and seconds per page."""
+
+    __slots__ = ("asked", "pages", "users", "latency")
+
+    def __init__(self):
+        self.asked = 0
+        self.pages = 0
+        self.users = 0.0
+        self.latency = 0.0
+
+    def observe(self, users, latency):
+        if self.pages == 0:
+            self.users, self.latency = float(users), latency
+        else:
+            self.users += SMOOTHING * (users - self.users)
+            self.latency += SMOOTHING * (latency - self.latency)
+        self.pages += 1
+
+    def users_per_second(self, rate=None):
+        """Throughput of this count; with `rate`, pages can't come faster than the rate budget allows."""
+        seconds = max(self.latency, 1.0 / rate if rate else 0.0)
+        return self.users / seconds if seconds > 0 else 0.0
+
+
+class PageSizer:
+    """Learns which page size ("count") of a paginated endpoint brings in users fastest.
+
+    APIs often cap or ignore the count they are sent, and bigger pages take
+    longer, so every candidate is tried a few times first. After that the
+    sizer asks for the count with the most users per second, taking the
+    host's current rate budget into account, and re-measures the others
+    now and then. Shared by every fetcher of the source, so it is locked.
+    """
+
+    def __init__(self, source, counts):
+        self.source = source
+        self.counts = tuple(sorted(counts))
+        self.stats_by_count = {count: CountStats() for count in self.counts}
+        self.chosen = None
+        self.choices = 0
+        self.rate = None
+        self.lock = threading.Lock()
+
+    def _best(self, rate):
+        scores = {count: self.stats_by_count[count].users_per_second(rate) for count in self.counts}
+        top = max(scores.values())
+        # Within noise of the best the smallest count wins: a count above the API's cap brings the same users
+        return min(count for count, score in scores.items() if score >= top * (1 - TIE_TOLERANCE))
+
+    def choose(self, rate=None):
+        """Count to request the next page with; `rate` is the host's allowed requests per second."""
+        with self.lock:
+            self.choices += 1
+            self.rate = rate
+            untried = [count for count in self.counts if self.stats_by_count[count].asked < SAMPLES_PER_COUNT]
+            if untried:
+                count = min(untried, key=lambda count: self.stats_by_count[count].asked)
+            else:
+                self.chosen = self._best(rate)
+                others = [count for count in self.counts if count != self.chosen]
+                count = self.chosen
+                if others and self.choices % EXPLORE_EVERY == 0:
+                    count = min(others, key=lambda count: self.stats_by_count[count].pages)
+            self.stats_by_count[count].asked += 1
+            return count
+
+    def observe(self, count, users, latency):
+        """Record a full page: `users` entries came back for `count` in `latency` seconds.
+
+        Only pages with a next cursor should be observed; the last page of a
+        timeline is short whatever count was asked for.
+        """
+        with self.lock:
+            self.stats_by_count[count].observe(users, latency)
+
+    def stats(self):
+        with self.lock:
+            rate = self.rate
+            return {
+                "chosen": self.chosen,
+                "rate_budget": round(rate, 3) if rate else None,
+                "counts": {
+                    count: {
+                        "pages": stats.pages,
+                        "avg_users": round(stats.users, 1),
+                        "avg_latency_ms": round(stats.latency * 1000, 1),
+                        "users_per_second": round(stats.users_per_second(rate), 2),
+                    }
+                    for count, stats in self.stats_by_count.items()
+                },
+            }
@@ -0,0 +1,41 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Threads that fetch the next page while the current one is being processed
+PREFETCH_WORKERS = int(os.getenv('PREFETCH_WORKERS', 16))
+
+_executor = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="prefetch")
+
+# Returned by next_cursor when there is nothing left to fetch (None is the first page's cursor)
+STOP = object()
+
+
+def paginate(fetch_page, cursor, next_cursor):
+    """Yield (cursor, page, following_cursor) while the following page is already in flight.
+
+    `fetch_page(cursor)` requests and decodes one page; it runs on the
+    prefetch pool. `next_cursor(cursor, page)` returns the cursor to request
+    next, or STOP. It runs in the caller's thread once the previous page has
+    been processed and before the following request goes out, so it is the
+    place to decide that `page` is the last one (end of the timeline, no new
+    entries) without spending a request. It should be cheap; the request is
+    issued before the caller starts writing `page`.
+
+    Exceptions raised by `fetch_page` surface from the generator when their
+    page is reached. Stopping early cancels the request still in flight if
+    it hasn't started yet.
+    """
+    future = _executor.submit(fetch_page, cursor)
+    try:
+        while future is not None:
+            page = future.result()
+            following = next_cursor(cursor, page)
+            if following is STOP:
+                future, following = None, None
+            else:
+                future = _executor.submit(fetch_page, following)
+            yield cursor, page, following
+            cursor = following
+    finally:
+        if future is not None:
+            future.cancel()
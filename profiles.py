@@ -0,0 +1,148 @@
+import os
+import sqlite3
+import threading
+import time
+
+PROFILE_DB = os.getenv('PROFILE_DB', 'profiles.db')
+
+# Columns results can be sorted by, with the column that breaks ties
+RESULT_SORTS = {
+    "followers_count": "u.followers_count {order}, u.id",
+    "username": "u.username COLLATE NOCASE {order}, u.id",
+    "id": "u.id {order}",
+}
+MAX_RESULTS_PAGE = int(os.getenv('MAX_RESULTS_PAGE', 500))
+
+
+class ProfileStore:
+    """Latest profile of every user seen, and which tweets they engaged with, kept in SQLite.
+
+    Fetchers record each page as it arrives, so the same account showing up
+    under many tweets and jobs is stored once and exports become queries on
+    the engagements index instead of merges of CSV files.
+    """
+
+    def __init__(self, path=PROFILE_DB):
+        self.path = path
+        self.local = threading.local()
+        with self._conn() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS users (
+                    id INTEGER PRIMARY KEY,
+                    username TEXT NOT NULL,
+                    name TEXT,
+                    followers_count INTEGER NOT NULL DEFAULT 0,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS engagements (
+                    tweet_id TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    user_id INTEGER NOT NULL,
+                    seen_at REAL NOT NULL,
+                    PRIMARY KEY (tweet_id, source, user_id)
+                ) WITHOUT ROWID
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS result_tweets (
+                    handle TEXT NOT NULL,
+                    tweet_id TEXT NOT NULL,
+                    PRIMARY KEY (handle, tweet_id)
+                ) WITHOUT ROWID
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS engagements_user ON engagements (user_id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS users_followers ON users (followers_count)")
+
+    def _conn(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+        return conn
+
+    def record(self, tweet_id, source, users):
+        """Upsert one page of EngagedUser records and link them to (tweet_id, source)."""
+        if not users:
+            return
+        now = time.time()
+        with self._conn() as conn:
+            conn.executemany(
+                "INSERT INTO users (id, username, name, followers_count, updated_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET username = excluded.username, name = excluded.name, "
+                "followers_count = excluded.followers_count, updated_at = excluded.updated_at",
+                ((user.id, user.username, user.name, user.followers_count, now) for user in users),
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO engagements (tweet_id, source, user_id, seen_at) VALUES (?, ?, ?, ?)",
+                ((tweet_id, source, user.id, now) for user in users),
+            )
+
+    def engaged_ids(self, tweet_id, source):
+        """Ids of the users already recorded for (tweet_id, source)."""
+        return set(
+            user_id for (user_id,) in self._conn().execute(
+                "SELECT user_id FROM engagements WHERE tweet_id = ? AND source = ?", (tweet_id, source)
+            )
+        )
+
+    def engaged_users(self, tweet_ids, min_followers=0):
+        """Yield each user who engaged with any of `tweet_ids` once, as a profile dict."""
+        tweet_ids = list(tweet_ids)
+        if not tweet_ids:
+            return
+        placeholders = ", ".join("?" * len(tweet_ids))
+        rows = self._conn().execute(
+            "SELECT id, username, name, followers_count FROM users WHERE followers_count >= ? AND id IN ("
+            f"SELECT user_id FROM engagements WHERE tweet_id IN ({placeholders})) ORDER BY id",
+            [min_followers] + tweet_ids,
+        )
+        for user_id, username, name, followers_count in rows:
+            yield {"username": username, "name": name, "id": str(user_id), "followers_count": followers_count}
+
+    def save_results(self, handle, tweet_ids):
+        """Point the results `handle` at the engagements of `tweet_ids`, replacing an earlier run."""
+        with self._conn() as conn:
+            conn.execute("DELETE FROM result_tweets WHERE handle = ?", (handle,))
+            conn.executemany(
+                "INSERT OR IGNORE INTO result_tweets (handle, tweet_id) VALUES (?, ?)",
+                ((handle, tweet_id) for tweet_id in tweet_ids),
+            )
+
+    def results(self, handle, source=None, min_followers=0, sort="followers_count", descending=True, offset=0, limit=100):
+        """One page of the users behind `handle`, each once, and the total matching.
+
+        Returns (total, users) or None if the handle is unknown. Every user
+        lists the sources they engaged through.
+        """
+        conn = self._conn()
+        if conn.execute("SELECT 1 FROM result_tweets WHERE handle = ? LIMIT 1", (handle,)).fetchone() is None:
+            return None
+        where = "e.tweet_id IN (SELECT tweet_id FROM result_tweets WHERE handle = ?) AND u.followers_count >= ?"
+        params = [handle, min_followers]
+        if source:
+            where += " AND e.source = ?"
+            params.append(source)
+        matches = f"FROM engagements e JOIN users u ON u.id = e.user_id WHERE {where}"
+        total = conn.execute(f"SELECT COUNT(DISTINCT u.id) {matches}", params).fetchone()[0]
+        order_by = RESULT_SORTS[sort].format(order="DESC" if descending else "ASC")
+        rows = conn.execute(
+            f"SELECT u.id, u.username, u.name, u.followers_count, GROUP_CONCAT(DISTINCT e.source) {matches} "
+            f"GROUP BY u.id ORDER BY {order_by} LIMIT ? OFFSET ?",
+            params + [min(limit, MAX_RESULTS_PAGE), offset],
+        )
+        users = [
+            {"username": username, "name": name, "id": str(user_id), "followers_count": followers_count,
+             "sources": sorted(sources.split(","))}
+            for user_id, username, name, followers_count, sources in rows
+        ]
+        return total, users
+
+    def stats(self):
+        conn = self._conn()
+        return {
+            "users": conn.execute("SELECT COUNT(*) FROM users").fetchone()[0],
+            "engagements": conn.execute("SELECT COUNT(*) FROM engagements").fetchone()[0],
+        }
@@ -0,0 +1,164 @@
+import os
+import threading
+import time
+
+# Starting rates (requests/second, burst) until response headers tell us better.
+DEFAULT_RATES = {
+    "twitter241.p.rapidapi.com": (float(os.getenv('RAPIDAPI_RATE', 5)), 10),
+    "twitter-x.p.rapidapi.com": (float(os.getenv('RAPIDAPI_RATE', 5)), 10),
+    "x.com": (float(os.getenv('X_RATE', 1)), 5),
+}
+FALLBACK_RATE = (1.0, 1)
+
+# Never go below this rate while the quota still has budget left
+MIN_RATE = 0.05
+# After a 429 halved a rate, every successful response grows it by this factor, up to the starting rate
+RECOVERY = 1.1
+# How long to back off on a 429 that carries no reset information
+DEFAULT_429_BACKOFF = 15.0
+
+
+def _header_float(headers, *names):
+    for name in names:
+        value = headers.get(name)
+        if value is None:
+            continue
+        try:
+            return float(value)
+        except ValueError:
+            continue
+    return None
+
+
+class TokenBucket:
+    """Token bucket whose rate can be retuned from server feedback."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.ceiling = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.throttled = 0
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self):
+        """Take one token and return how long the caller has to wait for it."""
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1
+            wait = max(0.0, -self.tokens / self.rate, self.blocked_until - now)
+            if wait > 0:
+                self.waits += 1
+                self.wait_seconds += wait
+            return wait
+
+    def block_for(self, seconds):
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            self.tokens = min(self.tokens, 0.0)
+
+    def set_rate(self, rate):
+        with self.lock:
+            self._refill(time.monotonic())
+            self.rate = max(rate, MIN_RATE)
+
+    def recover(self):
+        with self.lock:
+            if self.rate < self.ceiling:
+                self._refill(time.monotonic())
+                self.rate = min(self.ceiling, self.rate * RECOVERY)
+
+
+class RateLimiter:
+    """Token buckets keyed by (host, account), tuned from rate-limit headers and 429s.
+
+    x.com's x-rate-limit-* headers describe a 15 minute window, so the rate
+    follows remaining/reset there. RapidAPI's x-ratelimit-requests-* headers
+    count the plan's daily or monthly quota, which says nothing about how
+    fast we may go: they only block the bucket until the reset once the
+    quota is spent. The RapidAPI rate comes from 429s (halved, Retry-After
+    honoured) and grows back on successful responses.
+    """
+
+    def __init__(self, rates=None):
+        self.rates = dict(DEFAULT_RATES if rates is None else rates)
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def bucket(self, host, account=None):
+        key = (host, account)
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            with self.lock:
+                bucket = self.buckets.get(key)
+                if bucket is None:
+                    bucket = TokenBucket(*self.rates.get(host, FALLBACK_RATE))
+                    self.buckets[key] = bucket
+        return bucket
+
+    def acquire(self, host, account=None):
+        """Block until a request to `host` as `account` is allowed. Returns the wait in seconds."""
+        wait = self.bucket(host, account).reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def observe(self, host, account, response):
+        """Learn the allowed rate from a response's status and headers."""
+        bucket = self.bucket(host, account)
+        headers = response.headers
+        now = time.time()
+
+        # x.com: x-rate-limit-{limit,remaining,reset}, reset is an epoch timestamp
+        remaining = _header_float(headers, "x-rate-limit-remaining")
+        reset_in = None
+        window = remaining is not None
+        if window:
+            reset_at = _header_float(headers, "x-rate-limit-reset")
+            if reset_at is not None:
+                reset_in = max(reset_at - now, 1.0)
+        else:
+            # RapidAPI: x-ratelimit-requests-{limit,remaining,reset}, reset is seconds from now
+            remaining = _header_float(headers, "x-ratelimit-requests-remaining")
+            reset_in = _header_float(headers, "x-ratelimit-requests-reset")
+            if reset_in is not None:
+                reset_in = max(reset_in, 1.0)
+
+        if response.status_code == 429:
+            bucket.throttled += 1
+            retry_after = _header_float(headers, "retry-after")
+            if retry_after is None:
+                retry_after = reset_in if reset_in is not None and remaining == 0 else DEFAULT_429_BACKOFF
+            bucket.block_for(retry_after)
+            bucket.set_rate(bucket.rate / 2)
+            return
+
+        if remaining is not None and reset_in is not None and remaining <= 0:
+            bucket.block_for(reset_in)
+        elif window and reset_in is not None:
+            bucket.set_rate(remaining / reset_in)
+        else:
+            bucket.recover()
+
+    def stats(self):
+        with self.lock:
+            buckets = dict(self.buckets)
+        return {
+            f"{host}|{account or '-'}": {
+                "rate": round(bucket.rate, 3),
+                "tokens": round(bucket.tokens, 2),
+                "waits": bucket.waits,
+                "wait_seconds": round(bucket.wait_seconds, 2),
+                "throttled": bucket.throttled,
+            }
+            for (host, account), bucket in buckets.items()
+        }
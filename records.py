@@ -0,0 +1,32 @@
+class EngagedUser:
+    """One user who retweeted, commented on or quoted a tweet.
+
+    Slots instead of a per-user dict, with the id and follower count held as
+    ints, keep long scrapes from paying hundreds of bytes per user.
+    """
+
+    __slots__ = ("username", "name", "id", "followers_count")
+
+    def __init__(self, username, name, id, followers_count):
+        self.username = username
+        self.name = name
+        self.id = int(id)
+        self.followers_count = int(followers_count)
+
+    def as_row(self):
+        """The user as a CSV row of sinks.FIELDNAMES."""
+        return {
+            "username": self.username,
+            "name": self.name,
+            "id": self.id,
+            "followers_count": self.followers_count,
+        }
+
+    def __eq__(self, other):
+        return isinstance(other, EngagedUser) and self.id == other.id
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __repr__(self):
+        return f"EngagedUser({self.username!r}, id={self.id}, followers_count={self.followers_count})"
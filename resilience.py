@@ -0,0 +1,251 @@
+import logging
+import os
+import random
+import threading
+import time
+
+import requests
+
+import metrics
+from accounts import AccountLoggedOut
+
+logger = logging.getLogger(__name__)
+
+# Attempts per request (the first one included) before its error is handed to the caller
+MAX_ATTEMPTS = int(os.getenv('RETRY_MAX_ATTEMPTS', 4))
+# Backoff before retry n is uniform in [0, min(BACKOFF_CAP, BACKOFF_BASE * 2**n)] seconds
+BACKOFF_BASE = float(os.getenv('RETRY_BACKOFF_BASE', 0.5))
+BACKOFF_CAP = float(os.getenv('RETRY_BACKOFF_CAP', 30))
+# Retries one scrape job may spend across all its requests
+JOB_RETRY_BUDGET = int(os.getenv('JOB_RETRY_BUDGET', 100))
+# Failures in a row that open a breaker, and seconds it stays open before one trial request
+BREAKER_FAILURES = int(os.getenv('BREAKER_FAILURES', 5))
+BREAKER_RESET = float(os.getenv('BREAKER_RESET_SECONDS', 60))
+
+
+class ScrapeError(Exception):
+    """A request failed in a way the resilience layer understands."""
+
+    retryable = False
+
+
+class TransientError(ScrapeError):
+    """Server errors, timeouts, dropped connections, unreadable bodies: worth another try."""
+
+    retryable = True
+
+
+class RateLimited(TransientError):
+    """Still rate limited after http_client's own waits."""
+
+
+class PermanentError(ScrapeError):
+    """The request itself is wrong (404, 400, bad key); asking again gives the same answer."""
+
+
+class CircuitOpen(ScrapeError):
+    """A breaker is open, so the request was not sent. `account` is set for account breakers."""
+
+    def __init__(self, breaker, account=None):
+        super().__init__(f"Circuit {breaker.name} open for another {breaker.remaining():.0f}s")
+        self.account = account
+
+
+class RetryBudgetSpent(ScrapeError):
+    """The job has used up its retries."""
+
+
+def check(response, account=None):
+    """Return `response` if it is a 200, otherwise close it and raise its classified error.
+
+    401/403 mean the x.com session of `account` was rejected; without an
+    account (RapidAPI) they mean the key is, which no retry fixes.
+    """
+    status = response.status_code
+    if status == 200:
+        return response
+    response.close()
+    if status in (401, 403):
+        if account is not None:
+            raise AccountLoggedOut(account, status)
+        raise PermanentError(f"Rejected with status {status}")
+    if status == 429:
+        raise RateLimited("Rate limited (429)")
+    if status >= 500 or status == 408:
+        raise TransientError(f"Server error {status}")
+    raise PermanentError(f"Request failed with status {status}")
+
+
+def classify(error):
+    """The ScrapeError (or AccountLoggedOut) `error` amounts to; unknown errors are returned as they are."""
+    if isinstance(error, (ScrapeError, AccountLoggedOut)):
+        return error
+    if isinstance(error, (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)):
+        return TransientError(f"{type(error).__name__}: {error}")
+    if isinstance(error, ValueError):
+        # decoding.read_json: truncated or garbled body
+        return TransientError(str(error))
+    return error
+
+
+def backoff(attempt):
+    """Seconds to sleep before retry number `attempt` (0-based): exponential with full jitter."""
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+class RetryBudget:
+    """Retries a job may spend, shared by all of its fetchers."""
+
+    def __init__(self, retries=JOB_RETRY_BUDGET):
+        self.retries = retries
+        self.used = 0
+        self.lock = threading.Lock()
+
+    def spend(self):
+        """Take one retry; False once the budget is gone."""
+        with self.lock:
+            if self.used >= self.retries:
+                return False
+            self.used += 1
+            return True
+
+
+class CircuitBreaker:
+    """Stops requests to something that keeps failing.
+
+    Closed: requests go through and failures in a row are counted. After
+    BREAKER_FAILURES of them the breaker opens and rejects every request
+    for BREAKER_RESET seconds, then lets a single trial through (half-open).
+    The trial's success closes it again and its failure reopens it.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, name, failures=BREAKER_FAILURES, reset=BREAKER_RESET):
+        self.name = name
+        self.threshold = failures
+        self.reset = reset
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial = False
+        self.rejected = 0
+        self.lock = threading.Lock()
+
+    def remaining(self):
+        return max(0.0, self.opened_at + self.reset - time.monotonic())
+
+    def allow(self):
+        with self.lock:
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset:
+                self.state, self.trial = self.HALF_OPEN, False
+            if self.state == self.CLOSED or (self.state == self.HALF_OPEN and not self.trial):
+                self.trial = self.state == self.HALF_OPEN
+                return True
+            self.rejected += 1
+            return False
+
+    def release(self):
+        """Give back a half-open trial that was never used."""
+        with self.lock:
+            self.trial = False
+
+    def success(self):
+        with self.lock:
+            self.state, self.failures, self.trial = self.CLOSED, 0, False
+
+    def failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.threshold:
+                if self.state != self.OPEN:
+                    logger.warning(f"Circuit {self.name} open after {self.failures} failures")
+                self.state, self.opened_at, self.trial = self.OPEN, time.monotonic(), False
+
+    def stats(self):
+        with self.lock:
+            return {
+                "state": self.state,
+                "failures": self.failures,
+                "open_seconds": round(self.remaining()) if self.state == self.OPEN else 0,
+                "rejected": self.rejected,
+            }
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker(name):
+    """The shared breaker called `name`, created on first use."""
+    with _breakers_lock:
+        circuit = _breakers.get(name)
+        if circuit is None:
+            circuit = _breakers[name] = CircuitBreaker(name)
+        return circuit
+
+
+def breaker_stats():
+    with _breakers_lock:
+        breakers = dict(_breakers)
+    return {name: circuit.stats() for name, circuit in breakers.items()}
+
+
+def _admit(breakers, account):
+    """Raise CircuitOpen unless every breaker lets the request through."""
+    admitted = []
+    for circuit in breakers:
+        if not circuit.allow():
+            # Hand back half-open trials taken by the breakers before this one
+            for taken in admitted:
+                taken.release()
+            metrics.CIRCUIT_REJECTIONS.inc(circuit.name)
+            raise CircuitOpen(circuit, account if circuit is not breakers[0] else None)
+        admitted.append(circuit)
+
+
+def call(request, host, account=None, budget=None):
+    """Run `request()` (one upstream call) with retries and circuit breakers.
+
+    Transient errors are retried with jittered exponential backoff, up to
+    MAX_ATTEMPTS and while `budget` (the job's RetryBudget) lasts; they count
+    against the breaker of `host` and, with `account`, of that account.
+    AccountLoggedOut only counts against the account and is raised at once
+    so the caller can switch accounts; permanent errors are raised at once.
+    """
+    breakers = [breaker(host)]
+    if account:
+        breakers.append(breaker(f"{host}|{account}"))
+    attempt = 0
+    while True:
+        _admit(breakers, account)
+        try:
+            result = request()
+        except Exception as e:
+            error = classify(e)
+            if isinstance(error, AccountLoggedOut):
+                breakers[0].success()
+                breakers[-1].failure()
+                raise
+            if not isinstance(error, ScrapeError) or not error.retryable:
+                # The host answered; the request itself was the problem
+                for circuit in breakers:
+                    circuit.success()
+                if error is e:
+                    raise
+                raise error from e
+            for circuit in breakers:
+                circuit.failure()
+            attempt += 1
+            if attempt >= MAX_ATTEMPTS:
+                raise error from e
+            if budget is not None and not budget.spend():
+                raise RetryBudgetSpent(f"Job retry budget of {budget.retries} spent; last error: {error}") from e
+            delay = backoff(attempt - 1)
+            metrics.RETRIES.inc(host, type(error).__name__)
+            logger.warning(f"{type(error).__name__} from {host}: {error}; retry {attempt} in {delay:.1f}s")
+            time.sleep(delay)
+            continue
+        for circuit in breakers:
+            circuit.success()
+        return result
@@ -0,0 +1,143 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import urllib.parse
+from collections import OrderedDict
+
+import metrics
+
+RESPONSE_CACHE_DB = os.getenv('RESPONSE_CACHE_DB', 'response_cache.db')
+MEMORY_ENTRIES = int(os.getenv('RESPONSE_CACHE_ENTRIES', 1024))
+
+# Seconds a response stays fresh, per endpoint path. Endpoints not listed are not cached.
+ENDPOINT_TTLS = {
+    "/user": 30 * 24 * 3600,   # username -> REST id practically never changes
+    "/user-tweets": 5 * 60,    # recent timelines, shared by operators looking at the same account
+}
+
+
+def cache_key(endpoint):
+    """Normalise `endpoint` to path + sorted query so parameter order doesn't matter."""
+    parts = urllib.parse.urlsplit(endpoint)
+    query = urllib.parse.urlencode(sorted(urllib.parse.parse_qsl(parts.query)))
+    return f"{parts.path}?{query}"
+
+
+class MemoryTier:
+    """LRU dict of key -> (expires_at, value)."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+    def get(self, key, now):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= now:
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return entry
+
+    def set(self, key, expires_at, value):
+        self.entries[key] = (expires_at, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+
+class SqliteTier:
+    """Persistent tier shared by every worker on the machine."""
+
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, expires_at REAL NOT NULL, value TEXT NOT NULL)"
+            )
+
+    def _conn(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self.local.conn = conn
+        return conn
+
+    def get(self, key, now):
+        row = self._conn().execute(
+            "SELECT expires_at, value FROM responses WHERE key = ? AND expires_at > ?", (key, now)
+        ).fetchone()
+        return (row[0], json.loads(row[1])) if row else None
+
+    def set(self, key, expires_at, value):
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, expires_at, value) VALUES (?, ?, ?)",
+                (key, expires_at, json.dumps(value)),
+            )
+
+    def purge(self, now):
+        with self._conn() as conn:
+            conn.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+
+
+class ResponseCache:
+    """Two-tier TTL cache for API responses: in-memory LRU in front of SQLite."""
+
+    def __init__(self, ttls=ENDPOINT_TTLS, max_entries=MEMORY_ENTRIES, db_path=RESPONSE_CACHE_DB):
+        self.ttls = ttls
+        self.memory = MemoryTier(max_entries)
+        self.disk = SqliteTier(db_path) if db_path else None
+        if self.disk:
+            self.disk.purge(time.time())
+        self.lock = threading.Lock()
+        self.counters = {}
+
+    def _count(self, path, outcome):
+        counters = self.counters.setdefault(path, {"memory_hits": 0, "disk_hits": 0, "misses": 0})
+        counters[outcome] += 1
+        metrics.CACHE_LOOKUPS.inc(path, outcome)
+
+    def ttl_for(self, endpoint):
+        return self.ttls.get(urllib.parse.urlsplit(endpoint).path)
+
+    def get(self, endpoint):
+        """Return the cached response of `endpoint`, or None on a miss."""
+        path = urllib.parse.urlsplit(endpoint).path
+        if path not in self.ttls:
+            return None
+        key = cache_key(endpoint)
+        now = time.time()
+        with self.lock:
+            entry = self.memory.get(key, now)
+            if entry is not None:
+                self._count(path, "memory_hits")
+                return entry[1]
+        entry = self.disk.get(key, now) if self.disk else None
+        with self.lock:
+            if entry is None:
+                self._count(path, "misses")
+                return None
+            self.memory.set(key, *entry)
+            self._count(path, "disk_hits")
+            return entry[1]
+
+    def set(self, endpoint, value):
+        ttl = self.ttl_for(endpoint)
+        if not ttl:
+            return
+        key = cache_key(endpoint)
+        expires_at = time.time() + ttl
+        with self.lock:
+            self.memory.set(key, expires_at, value)
+        if self.disk:
+            self.disk.set(key, expires_at, value)
+
+    def stats(self):
+        with self.lock:
+            return {path: dict(counters) for path, counters in self.counters.items()}
@@ -0,0 +1,78 @@
+import heapq
+import os
+
+# Users below this many followers are not written to the CSV outputs
+MIN_FOLLOWERS = int(os.getenv('MIN_FOLLOWERS', 800))
+
+
+class Selection:
+    """Which engagers a scrape keeps and how far it pages.
+
+    `min_followers` decides who is written out, `top_k` bounds how many users
+    are held in memory (the K with the most followers) and `page_budget`
+    stops each (tweet, source) after that many pages.
+    """
+
+    __slots__ = ("min_followers", "top_k", "page_budget")
+
+    def __init__(self, min_followers=MIN_FOLLOWERS, top_k=None, page_budget=None):
+        self.min_followers = MIN_FOLLOWERS if min_followers is None else min_followers
+        self.top_k = top_k or None
+        self.page_budget = page_budget or None
+
+    def keeps(self, user):
+        return user.followers_count >= self.min_followers
+
+    def budget_spent(self, page_count):
+        return self.page_budget is not None and page_count >= self.page_budget
+
+    def collector(self):
+        return Collector(self.top_k)
+
+
+class Collector:
+    """The engagers a fetcher hands back: every one, or only the top K by followers.
+
+    With `top_k` the users sit in a min-heap of at most K entries, so memory
+    stays O(K) however many pages are read. len() is the number of users
+    added, kept or not.
+    """
+
+    def __init__(self, top_k=None):
+        self.top_k = top_k
+        self.kept = []
+        self.ids = set()
+        self.count = 0
+
+    def add(self, user):
+        self.count += 1
+        if self.top_k is None:
+            self.kept.append(user)
+            return
+        # The same user can reach a cross-source collector more than once
+        if user.id in self.ids:
+            return
+        entry = (user.followers_count, user.id, user)
+        if len(self.kept) < self.top_k:
+            heapq.heappush(self.kept, entry)
+            self.ids.add(user.id)
+        elif entry[:2] > self.kept[0][:2]:
+            _, evicted, _ = heapq.heapreplace(self.kept, entry)
+            self.ids.discard(evicted)
+            self.ids.add(user.id)
+
+    def extend(self, users):
+        for user in users:
+            self.add(user)
+
+    def users(self):
+        """Kept users; with top_k, most followers first."""
+        if self.top_k is None:
+            return list(self.kept)
+        return [user for _, _, user in sorted(self.kept, key=lambda entry: entry[:2], reverse=True)]
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        return iter(self.users())
@@ -0,0 +1,71 @@
+import csv
+import os
+import threading
+
+FIELDNAMES = ["username", "name", "id", "followers_count"]
+
+# Rows buffered per file before they are written out
+FLUSH_EVERY = int(os.getenv('CSV_FLUSH_EVERY', 500))
+
+
+class CsvSink:
+    """Buffered CSV output that keeps one handle per file.
+
+    Rows are appended to an in-memory buffer and written in batches; the
+    header is written once when a file is first created. Use it as a
+    context manager so buffered rows are flushed even if the fetcher fails.
+    """
+
+    def __init__(self, fieldnames=FIELDNAMES, flush_every=FLUSH_EVERY):
+        self.fieldnames = fieldnames
+        self.flush_every = flush_every
+        self.files = {}
+        self.writers = {}
+        self.buffers = {}
+        self.lock = threading.Lock()
+
+    def _open(self, path):
+        file_exists = os.path.isfile(path)
+        handle = open(path, 'a', encoding="utf-8", newline="")
+        writer = csv.DictWriter(handle, fieldnames=self.fieldnames)
+        if not file_exists:
+            writer.writeheader()
+        self.files[path] = handle
+        self.writers[path] = writer
+        self.buffers[path] = []
+
+    def write(self, path, row):
+        with self.lock:
+            if path not in self.files:
+                self._open(path)
+            buffer = self.buffers[path]
+            buffer.append(row)
+            if len(buffer) >= self.flush_every:
+                self._flush(path)
+
+    def _flush(self, path):
+        buffer = self.buffers[path]
+        if buffer:
+            self.writers[path].writerows(buffer)
+            buffer.clear()
+        self.files[path].flush()
+
+    def flush(self):
+        with self.lock:
+            for path in self.files:
+                self._flush(path)
+
+    def close(self):
+        with self.lock:
+            for path, handle in self.files.items():
+                self._flush(path)
+                handle.close()
+            self.files.clear()
+            self.writers.clear()
+            self.buffers.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,126 @@
+# Every endpoint we scrape returns the same timeline shape: instructions ->
+# entries -> content -> itemContent (or items[].item.itemContent for
+# conversation modules) -> user_results / tweet_results.
+
+
+class Fields:
+    """Named fields of a timeline result: `select(result)` returns them as a tuple in `names` order."""
+
+    def __init__(self, names, select):
+        self.names = tuple(names)
+        self.select = select
+
+
+# The selectors look every shared prefix up once and read the fields with
+# plain subscripts; a missing key raises KeyError, which extract_timeline
+# counts as a skipped entry.
+
+def _user(result):
+    legacy = result["legacy"]
+    return (legacy["screen_name"], legacy["name"], result["rest_id"], legacy["followers_count"])
+
+
+def _tweet(result):
+    legacy = result["legacy"]
+    return (
+        legacy["id_str"],
+        legacy["full_text"],
+        legacy["retweet_count"],
+        legacy["favorite_count"],
+        legacy["lang"],
+        "retweeted_status_result" in result,
+        legacy.get("is_quote_status", False),
+    )
+
+
+def _engagement(result):
+    author = result["core"]["user_results"]["result"]
+    legacy = author["legacy"]
+    return (result["legacy"]["id_str"], legacy["screen_name"], legacy["name"], author["rest_id"], legacy["followers_count"])
+
+
+def _quote(result):
+    return _tweet(result) + _user(result["core"]["user_results"]["result"])
+
+
+USER_NAMES = ("username", "name", "id", "followers_count")
+TWEET_NAMES = ("tweet_id", "text", "retweet_count", "favorite_count", "language", "is_retweet", "is_quote")
+
+# user_results.result of retweeter timelines
+USER_FIELDS = Fields(USER_NAMES, _user)
+
+# tweet_results.result of user timelines
+TWEET_FIELDS = Fields(TWEET_NAMES, _tweet)
+
+# Replies: the reply id plus its author
+ENGAGEMENT_FIELDS = Fields(("tweet_id",) + USER_NAMES, _engagement)
+
+# Quotes: the full quote tweet plus its author
+QUOTE_FIELDS = Fields(TWEET_NAMES + USER_NAMES, _quote)
+
+
+class TimelinePage:
+    __slots__ = ("users", "tweets", "cursor", "skipped")
+
+    def __init__(self):
+        self.users = []
+        self.tweets = []
+        self.cursor = None
+        self.skipped = 0
+
+
+def extract_timeline(instructions, users=None, tweets=None, modules_only=False, top_level_only=False):
+    """Walk `instructions` once, selecting `users` or `tweets` fields and the bottom cursor.
+
+    Entries whose result lacks a selected field (suspended users, tombstones,
+    visibility wrappers) are counted in `page.skipped` instead of raising.
+    With `modules_only`, only conversation modules (content.items) are read:
+    reply pages carry the focal tweet itself as a top-level entry. With
+    `top_level_only`, only top-level entries of TimelineAddEntries are read:
+    on user timelines, conversation modules hold thread tweets that would
+    push the user's own tweets out of the first page.
+    """
+    if (users is None) == (tweets is None):
+        raise ValueError("Select exactly one of users or tweets")
+    if modules_only and top_level_only:
+        raise ValueError("modules_only and top_level_only exclude each other")
+    page = TimelinePage()
+    if users is not None:
+        key, select, records = "user_results", users.select, page.users
+    else:
+        key, select, records = "tweet_results", tweets.select, page.tweets
+    append = records.append
+
+    for instruction in instructions:
+        if not instruction or (top_level_only and instruction.get("type") != "TimelineAddEntries"):
+            continue
+        entries = instruction.get("entries")
+        if not entries:
+            continue
+        for entry in entries:
+            content = entry.get("content")
+            if not content:
+                continue
+            item_content = content.get("itemContent")
+            if item_content is not None:
+                if key in item_content and not modules_only:
+                    try:
+                        append(select(item_content[key]["result"]))
+                    except (KeyError, TypeError):
+                        page.skipped += 1
+                continue
+            items = content.get("items")
+            if items is not None:
+                if top_level_only:
+                    continue
+                for item in items:
+                    try:
+                        item_content = item["item"]["itemContent"]
+                        if key in item_content:
+                            append(select(item_content[key]["result"]))
+                    except (KeyError, TypeError):
+                        page.skipped += 1
+                continue
+            if content.get("cursorType") == "Bottom":
+                page.cursor = content.get("value")
+    return page